@@ -34,7 +34,11 @@ import sys
 import os
 from importlib import metadata
 
+# Command line tools without graphical interface: python ELEMYO_GUI.py record ... (see ELEMYO_recording.py)
+headless = __name__ == '__main__' and len(sys.argv) > 1
+
 missing = {'pyserial', 'pyqtgraph', 'PyQt5', 'numpy', 'scipy'} 
+if headless: missing -= {'pyqtgraph', 'PyQt5'}
 for dist in metadata.distributions():
     if dist.name in missing:
         missing.remove(dist.name)
@@ -43,18 +47,31 @@ if missing:
     for module in missing:
         os.system("python -m pip install " + module)
 
+if headless:
+    from ELEMYO_recording import main
+    sys.exit(main(sys.argv[1:]))
+
 from PyQt5 import QtCore, QtWidgets, QtGui
 from PyQt5.QtCore import Qt
-import serial
 import pyqtgraph as pg
 import numpy as np
 import time
-from scipy.signal import butter, lfilter
-import serial.tools.list_ports
-from scipy.fftpack import fft
-from serial import SerialException
 from datetime import datetime
-import struct
+from ELEMYO_recording import openRecording, RecordingWriter, RecordingOverview, PlaybackClock, FeaturesWriter, PLAYBACK_SPEEDS
+from ELEMYO_stream import StreamServer, STREAM_PORT
+from ELEMYO_analysis import Spectrum, Spectrogram, Features, FFT_SIZES, FFT_WINDOWS, FEATURES
+from ELEMYO_core import GAINS, SENSORS_MAX, LOSS_NAMES, SerialMonitor, DeviceManager, EMGPipeline, loadStages, RingBuffer, MinMaxDecimator, Profiler, FrameScheduler
+
+DEVICES_MAX = 4 # Maximum number of devices read at the same time
+CHANNELS_MAX = SENSORS_MAX*DEVICES_MAX # Maximum number of plotted channels
+SENSOR_COLORS = [(153, 0, 0), (229, 104, 19), (221, 180, 10), (30, 180, 30), (11, 50, 51), (29, 160, 191)] # Colors of sensor numbers
+FPS_DEFAULT = 25 # Default target frame rate of graphics updates
+FPS_RANGE = (5, 60) # Range of target frame rate
+PROFILER_REPORT = 2 # Period of profiler reports in text window in s
+PROFILER_HISTOGRAM = (0.005, 0.01, 0.02, 0.05, 0.1) # Edges of update time histogram bins in s
+LOSS_REPORT = 1 # Minimum period of sample loss reports in text window in s
+FEATURES_WINDOW = 256 # Window of EMG features in samples
+FEATURES_HOP = 32 # Samples between EMG features windows
 
 # Main window
 class GUI(QtWidgets.QMainWindow):
@@ -65,7 +82,7 @@ class GUI(QtWidgets.QMainWindow):
     # Custom constructor 
     def initUI(self): 
         # Values
-        self.delay = 0.07 # Graphics update delay
+        self.scheduler = FrameScheduler(FPS_DEFAULT) # Pacing of graphics updates
         self.setWindowTitle("ELEMYO GUI v1.2.0")
         self.setWindowIcon(QtGui.QIcon('img/icon.png'))
         
@@ -77,30 +94,55 @@ class GUI(QtWidgets.QMainWindow):
         
         self.timeWidth = 10 # Plot window length in seconds
         self.dataWidth = int((self.timeWidth + 1)/self.dt) # Maximum count of plotting data points (11 seconds window)
-        self.Data = np.zeros((6, self.dataWidth)) # Raw data array, first index - sensor number, second index - sensor data
-        self.DataEnvelope = np.zeros((6, self.dataWidth)) # Envelope of row data, first index - sensor number, second index - sensor data
-        self.l = 0 # Current sensor data point
-        self.Time = [0]*self.dataWidth # Time array (in seconds)
+        self.devicesNumber = 1 # Number of devices, each sends up to SENSORS_MAX channels
+        self.Data = RingBuffer(SENSORS_MAX, self.dataWidth) # Raw data buffer, first index - channel number, second index - sensor data, time in s
+        self.DataFiltered = RingBuffer(SENSORS_MAX, self.dataWidth, timed=False) # Filtered data buffer
+        self.DataEnvelope = RingBuffer(SENSORS_MAX, self.dataWidth, timed=False) # Envelope of row data buffer
         self.sampleNum = 0
         self.xRangeStart = 0
         
-        self.MovingAverage = MovingAverage() # Variable for data envelope (for moving average method)
+        # Filters, offset, μV scaling and envelope (moving average method) with state between updates,
+        # custom stages are given by ELEMYO_PIPELINE environment variable: module:Class,...
+        self.pipeline = EMGPipeline(loadStages(os.environ.get('ELEMYO_PIPELINE', '')))
+        self.pipelineSettings = {} # Settings of standard pipeline stages
+        self.rawDecimator = MinMaxDecimator() # Min/max of filtered data for each pixel column of plots
+        self.envelopeDecimator = MinMaxDecimator() # Min/max of envelope data for each pixel column of plots
         
         self.recordingFileName_BIN = '' # Recording file name
         self.recordingFileName_TXT = '' # Recording file name
-        self.recordingFile_BIN = None # Recording file 
-        self.recordingFile_TXT = None # Recording file
+        self.recordingWriter = None # Background writer of recording files
+        self.recordingStalls = 0 # Number of reported recording queue overflows
         self.loadFileName = '' # Data load file name
-        self.loadFile = None # Data load variable
+        self.loadFile = None # Playback recording
         self.sliderpos = 0 # Position of data slider 
         self.loadDataLen = 0 # Number of signal samples in data file
-        self.loadData = 0 # Data from load file
-        
-        self.FFT = np.zeros((6, 2000)) # Fast Fourier transform data
+        self.playbackClock = PlaybackClock(self.fs) # Real-time clock of playback
+        self.overviewWindow = None # Overview of playback file
+        self.renderTime = 0 # Time of last plots update
+        self.renderFrame = True # Update plots in current frame
+        
+        self.spectrum = Spectrum() # Amplitude spectrum of sensors signal
+        self.spectrogram = Spectrogram() # Time-frequency waterfall of selected sensor signal
+        
+        # EMG features of filtered signal, computed for new samples only, one row every FEATURES_HOP samples
+        self.features = Features(FEATURES_WINDOW, FEATURES_HOP)
+        self.featuresData = RingBuffer(len(FEATURES)*SENSORS_MAX, self.dataWidth//FEATURES_HOP + 1) # Features rows, index - feature*channels + channel
+        self.featuresWriter = None # Writer of features file
+        self.featuresFileTime = -np.inf # Time of last row written to features file
+        
+        # Timing of update stages, shown in text window every PROFILER_REPORT s
+        self.profiler = Profiler(('ui', 'read', 'buffer', 'record', 'pipeline', 'features', 'decimate', 'plots', 'fft', 'spectrogram'), 
+                                 ('samples', 'backlog', 'lost'))
+        self.profilerReport = 0 # Time of last profiler report
+        self.lossReport = 0 # Time of last sample loss report
+        self.lostSamples = {} # Samples lost since last loss report, key - loss kind
         
         # Accessory variables for data read from serial
         self.ms_len = 0;
-        self.msg_end = bytearray([0])
+        self.deviceManager = None # Acquisition threads of all devices
+        self.extraPorts = [] # Ports of devices 2..N read together with selected port
+        self.streamServer = None # Publisher of live data to other programs
+        self.timeOrigin = None # Acquisition time of the first displayed sample
         
         # Menu panel
         self.COMports=QtWidgets.QComboBox()
@@ -142,6 +184,50 @@ class GUI(QtWidgets.QMainWindow):
         self.slider.setFixedWidth(40)
         self.slider.setDisabled(True) 
         
+        self.playbackSpeedBox = QtWidgets.QComboBox()
+        for speed in PLAYBACK_SPEEDS: self.playbackSpeedBox.addItem(str(speed) + " x")
+        self.playbackSpeedBox.setCurrentIndex(PLAYBACK_SPEEDS.index(1))
+        self.playbackSpeedBox.setToolTip('Playback speed')
+        self.playbackSpeedBox.setDisabled(True)
+        self.playbackSpeedBox.currentIndexChanged.connect(self.setPlaybackSpeed)
+        
+        self.overviewAction = QtWidgets.QAction('OVERVIEW', self)
+        self.overviewAction.setToolTip('Overview of whole playback file, double click - jump to time')
+        self.overviewAction.triggered.connect(self.showOverview)
+        self.overviewAction.setDisabled(True)
+        
+        self.devicesMenu = QtWidgets.QMenu(self) # Checkable ports of devices 2..N
+        self.devicesMenu.aboutToShow.connect(self.updateDevicesMenu)
+        self.devicesMenu.triggered.connect(self.selectDevices)
+        self.devicesButton = QtWidgets.QToolButton()
+        self.devicesButton.setText('DEVICES')
+        self.devicesButton.setToolTip('Ports of devices read together with selected port, channels are aligned in time')
+        self.devicesButton.setPopupMode(QtWidgets.QToolButton.InstantPopup)
+        self.devicesButton.setMenu(self.devicesMenu)
+        
+        self.fpsBox = QtWidgets.QSpinBox()
+        self.fpsBox.setRange(*FPS_RANGE)
+        self.fpsBox.setValue(FPS_DEFAULT)
+        self.fpsBox.setSuffix(' FPS')
+        self.fpsBox.setToolTip('Target frame rate, lowered automatically when updates take longer')
+        self.fpsBox.valueChanged.connect(self.setFrameRate)
+        
+        self.profilerAction = QtWidgets.QAction('PROFILER', self)
+        self.profilerAction.setCheckable(True)
+        self.profilerAction.setToolTip('Timing of update stages in text window, trace is saved to *_profile.csv when switched off')
+        self.profilerAction.triggered.connect(self.profiling)
+        
+        self.streamAction = QtWidgets.QAction('STREAM', self)
+        self.streamAction.setCheckable(True)
+        self.streamAction.setToolTip('Stream of live raw, filtered and envelope data to other programs, TCP/UDP port ' + str(STREAM_PORT) + 
+                                     ' (see ELEMYO_stream.py)')
+        self.streamAction.triggered.connect(self.streaming)
+        
+        self.featuresFileAction = QtWidgets.QAction('FEATURES FILE', self)
+        self.featuresFileAction.setCheckable(True)
+        self.featuresFileAction.setToolTip('Write EMG features (' + ', '.join(FEATURES) + ') of all sensors to *_features.csv file')
+        self.featuresFileAction.triggered.connect(self.featuresRecording)
+        
         self.sensorsNumberAction = QtWidgets.QLabel('SENSORS NUMBER: ', self)
         self.sensorsNumberAction1 = QtWidgets.QLabel('     ', self)
         self.sensorsNumber = QtWidgets.QDoubleSpinBox()
@@ -209,6 +295,34 @@ class GUI(QtWidgets.QMainWindow):
         
         self.sensorSelectedActionBox=QtWidgets.QComboBox()
         self.sensorSelectedActionBox.addItem("1")
+        
+        self.fftSize = QtWidgets.QLabel('FFT: ', self)
+        self.fftSizeBox=QtWidgets.QComboBox()
+        for size in FFT_SIZES: self.fftSizeBox.addItem(str(size))
+        self.fftSizeBox.setCurrentIndex(FFT_SIZES.index(2048))
+        
+        self.fftWindowBox=QtWidgets.QComboBox()
+        for window in FFT_WINDOWS: self.fftWindowBox.addItem(window.capitalize())
+        self.fftWindowBox.setCurrentIndex(FFT_WINDOWS.index('hann'))
+        
+        self.welchAction = QtWidgets.QCheckBox('Welch', self)
+        self.welchAction.setToolTip('Average spectrum of 8 overlapping segments')
+        self.fftAllAction = QtWidgets.QCheckBox('All', self)
+        self.fftAllAction.setToolTip('Spectrum of all sensors')
+        self.sensorSelectedActionBox.currentIndexChanged.connect(self.spectrum.reset)
+        self.sensorSelectedActionBox.currentIndexChanged.connect(self.spectrogram.reset)
+        
+        self.fftFrequencyLabel = QtWidgets.QLabel('MNF: 0 Hz\nMDF: 0 Hz', self)
+        self.fftFrequencyLabel.setToolTip('Mean and median frequency in band-pass filter range')
+        
+        self.spectrogramAction = QtWidgets.QCheckBox('Waterfall', self)
+        self.spectrogramAction.setChecked(True)
+        self.spectrogramAction.setToolTip('Spectrogram of selected sensor')
+        
+        self.featureBox = QtWidgets.QComboBox()
+        for name in FEATURES: self.featureBox.addItem(name)
+        self.featureBox.setToolTip('EMG feature of sliding window: RMS, mean absolute value, waveform length, zero crossings, '
+                                   'slope sign changes, mean and median frequency')
 
 #--------------------------        
         # Toolbar
@@ -217,13 +331,20 @@ class GUI(QtWidgets.QMainWindow):
         toolbar.append(self.addToolBar('Tool2'))
         toolbar.append(self.addToolBar('Tool3'))
         toolbar[0].addWidget(self.COMports)
+        toolbar[0].addWidget(self.devicesButton)
         toolbar[0].addAction(self.liveFromSerialAction)
         toolbar[0].addAction(self.dataRecordingAction)
         toolbar[0].addAction(self.refreshAction)
         toolbar[0].addAction(self.pauseAction)
+        toolbar[0].addWidget(self.fpsBox)
+        toolbar[0].addAction(self.profilerAction)
+        toolbar[0].addAction(self.streamAction)
+        toolbar[0].addAction(self.featuresFileAction)
         toolbar[1].addAction(dataLoadAction)
         toolbar[1].addAction(self.PlaybackAction)
         toolbar[1].addWidget(self.slider)
+        toolbar[1].addWidget(self.playbackSpeedBox)
+        toolbar[1].addAction(self.overviewAction)
         toolbar[2].addWidget(self.sensorsNumberAction)
         toolbar[2].addWidget(self.sensorsNumber)
         toolbar[2].addWidget(self.SignalType)
@@ -244,12 +365,12 @@ class GUI(QtWidgets.QMainWindow):
         toolbar[2].addWidget(self.bandpassAction1)
         toolbar[2].addWidget(self.passHighFreq)
         
-        # Plot widgets for 1-6 sensors
-        self.pw = [] # Plot widget array, index - sensor number
-        self.p = [] # Raw data plot, index - sensor number
-        self.pe = [] # Envelope data plot, index - sensor number
+        # Plot widgets for channels of all devices
+        self.pw = [] # Plot widget array, index - channel number
+        self.p = [] # Raw data plot, index - channel number
+        self.pe = [] # Envelope data plot, index - channel number
         
-        for i in range(6):
+        for i in range(CHANNELS_MAX):
             self.pw.append(pg.PlotWidget(background=(21 , 21, 21, 255)))
             self.pw[i].showGrid(x=True, y=True, alpha=0.7) 
             self.pw[i].setLabel('bottom', 'Time', 's')
@@ -258,7 +379,7 @@ class GUI(QtWidgets.QMainWindow):
             self.p[i].setPen(color=(100, 255, 255), width=0.8)
             self.pe[i].setPen(color=(255, 0, 0), width=1)
 
-        for i in range(5):
+        for i in range(CHANNELS_MAX - 1):
             self.pw[i+1].setXLink(self.pw[i])
         
         # Plot widget for spectral Plot
@@ -266,22 +387,44 @@ class GUI(QtWidgets.QMainWindow):
         self.pwFFT.showGrid(x=True, y=True, alpha=0.7) 
         self.pFFT = self.pwFFT.plot()
         self.pFFT.setPen(color=(100, 255, 255), width=1)
+        self.pFFTAll = [] # Spectrum plot of each sensor, shown for all sensors mode
+        for color in SENSOR_COLORS*DEVICES_MAX:
+            self.pFFTAll.append(self.pwFFT.plot())
+            self.pFFTAll[-1].setPen(color=color, width=1)
         self.pwFFT.setLabel('bottom', 'Frequency (Hz). ' + 'Sampling frequency = ' + str(int(self.fs)) + ' Hz.')
         
+        # Spectrogram widget, image is a ring of columns filled from left to right as time plots
+        self.pwSpectrogram = pg.PlotWidget(background=(13, 13, 13, 255))
+        self.pwSpectrogram.setLabel('bottom', 'Time', 's')
+        self.pwSpectrogram.setLabel('left', 'Frequency', 'Hz')
+        self.spectrogramImage = pg.ImageItem()
+        self.spectrogramImage.setLookupTable(pg.colormap.get('inferno').getLookupTable())
+        self.pwSpectrogram.addItem(self.spectrogramImage)
+        self.spectrogramLine = pg.InfiniteLine(pen=(100, 255, 255))
+        self.pwSpectrogram.addItem(self.spectrogramLine)
+        self.spectrogramAction.toggled.connect(self.pwSpectrogram.setVisible)
+        
         # Histogram widget
-        self.pb = [] # Histogram item array, index - sensor number
+        self.pb = [] # Histogram item array, index - channel number
         self.pbar = pg.PlotWidget(background=(13 , 13, 13, 255))
         self.pbar.showGrid(x=True, y=True, alpha=0.7)            
-        self.pb.append(pg.BarGraphItem(x=np.linspace(1, 2, num=1), height=np.linspace(0, 2, num=1), width=0.3, pen=QtGui.QColor(153, 0, 0), brush=QtGui.QColor(153, 0, 0)))
-        self.pb.append(pg.BarGraphItem(x=np.linspace(2, 3, num=1), height=np.linspace(0, 3, num=1), width=0.3, pen=QtGui.QColor(229, 104, 19), brush=QtGui.QColor(229, 104, 19)))
-        self.pb.append(pg.BarGraphItem(x=np.linspace(3, 4, num=1), height=np.linspace(0, 4, num=1), width=0.3, pen=QtGui.QColor(221, 180, 10), brush=QtGui.QColor(221, 180, 10)))
-        self.pb.append(pg.BarGraphItem(x=np.linspace(4, 5, num=1), height=np.linspace(0, 5, num=1), width=0.3, pen=QtGui.QColor(30, 180, 30), brush=QtGui.QColor(30, 180, 30)))
-        self.pb.append(pg.BarGraphItem(x=np.linspace(5, 6, num=1), height=np.linspace(0, 6, num=1), width=0.3, pen=QtGui.QColor(11, 50, 51), brush=QtGui.QColor(11, 50, 51)))
-        self.pb.append(pg.BarGraphItem(x=np.linspace(6, 7, num=1), height=np.linspace(0, 7, num=1), width=0.3, pen=QtGui.QColor(29, 160, 191), brush=QtGui.QColor(29, 160, 191)))
+        for i, color in enumerate(SENSOR_COLORS*DEVICES_MAX):
+            self.pb.append(pg.BarGraphItem(x=np.linspace(i + 1, i + 2, num=1), height=np.linspace(0, i + 2, num=1), width=0.3, 
+                                           pen=QtGui.QColor(*color), brush=QtGui.QColor(*color)))
         self.pbar.addItem(self.pb[0])  
         self.pbar.setLabel('bottom', 'Sensor number')
         self.pbar.setXRange(2, 0.05)
         
+        # EMG features widget, trace of selected feature for each sensor, same time range as sensors plots
+        self.pwFeatures = pg.PlotWidget(background=(13, 13, 13, 255))
+        self.pwFeatures.showGrid(x=True, y=True, alpha=0.7)
+        self.pwFeatures.setLabel('bottom', 'Time', 's')
+        self.pwFeatures.setXLink(self.pw[0])
+        self.pFeatures = [] # Feature plot of each sensor
+        for color in SENSOR_COLORS*DEVICES_MAX:
+            self.pFeatures.append(self.pwFeatures.plot())
+            self.pFeatures[-1].setPen(color=color, width=1)
+        
         # Style
         centralStyle = "color: rgb(255, 255, 255); background-color: rgb(13, 13, 13);"
                
@@ -296,36 +439,24 @@ class GUI(QtWidgets.QMainWindow):
             self.button_group.addButton(fftButton[i], i + 1)
         
         backLabel = []
-        for i in range(5):
+        for i in range(CHANNELS_MAX//2):
             backLabel.append(QtWidgets.QLabel(""))
             backLabel[i].setStyleSheet("font-size: 25px; background-color: rgb(21, 21, 21);")
         
         numberLabel = []
-        for i in range(6):
+        for i, color in enumerate(SENSOR_COLORS*DEVICES_MAX):
             numberLabel.append(QtWidgets.QLabel(" " + str(i+1) + " "))
-        numberLabel[0].setStyleSheet("font-size: 25px; background-color: rgb(153, 0, 0); border-radius: 14px;")
-        numberLabel[1].setStyleSheet("font-size: 25px; background-color: rgb(229, 104, 19); border-radius: 14px;") 
-        numberLabel[2].setStyleSheet("font-size: 25px; background-color: rgb(221, 180, 10); border-radius: 14px;")
-        numberLabel[3].setStyleSheet("font-size: 25px; background-color: rgb(30, 180, 30); border-radius: 14px;")
-        numberLabel[4].setStyleSheet("font-size: 25px; background-color: rgb(11, 50, 51); border-radius: 14px;")
-        numberLabel[5].setStyleSheet("font-size: 25px; background-color: rgb(29, 160, 191); border-radius: 14px;")
+            numberLabel[i].setStyleSheet("font-size: 25px; background-color: rgb" + str(color) + "; border-radius: 14px;")
         
         self.gainLabel  = []
         self.gainBox  = []
-        for i in range(6):
+        for i in range(CHANNELS_MAX):
             self.gainLabel.append(QtWidgets.QLabel("GAIN: 1000 x"))
             self.gainBox.append(QtWidgets.QComboBox())
-        for i in range(6):
+        for i in range(CHANNELS_MAX):
             self.gainBox[i].currentIndexChanged.connect(self.setGain)
             self.gainBox[i].setDisabled(True)
-            self.gainBox[i].addItem("1")
-            self.gainBox[i].addItem("2")
-            self.gainBox[i].addItem("4")
-            self.gainBox[i].addItem("5")
-            self.gainBox[i].addItem("8")
-            self.gainBox[i].addItem("10")
-            self.gainBox[i].addItem("16")
-            self.gainBox[i].addItem("32")
+            for gain in GAINS: self.gainBox[i].addItem(str(gain))
     
        # Main widget
         centralWidget = QtWidgets.QWidget()
@@ -344,7 +475,7 @@ class GUI(QtWidgets.QMainWindow):
         
         plotLayout = []
         self.row = []
-        for i in range(6):
+        for i in range(CHANNELS_MAX):
             plotLayout.append(QtWidgets.QGridLayout())
             plotLayout[i] = QtWidgets.QGridLayout()
             if i % 2 == 0: plotLayout[i].addWidget(backLabel[int(i/2)], 0, 0, 10, 1)
@@ -360,16 +491,26 @@ class GUI(QtWidgets.QMainWindow):
         
         splitter = QtWidgets.QSplitter(Qt.Vertical)
         splitter.handle(100)
-        for i in range(6): splitter.addWidget(self.row[i])
+        for i in range(CHANNELS_MAX): splitter.addWidget(self.row[i])
         
         layout = QtWidgets.QGridLayout()       
         layout.addWidget(splitter, 0, 0, 40, 4)
-        layout.addWidget(self.pbar, 0, 4, 20, 11)
-        layout.addWidget(self.pwFFT, 20, 4, 16, 11)
+        layout.addWidget(self.pbar, 0, 4, 10, 11)
+        layout.addWidget(self.pwFeatures, 10, 4, 10, 11)
+        layout.addWidget(self.featureBox, 10, 14, 1, 1)
+        layout.addWidget(self.pwFFT, 20, 4, 9, 11)
+        layout.addWidget(self.pwSpectrogram, 29, 4, 7, 11)
         layout.setColumnStretch(2, 2)
         
-        layout.addWidget(self.sensorSelectedAction , 20, 13, 2, 1)
-        layout.addWidget(self.sensorSelectedActionBox , 20, 14, 2, 1)
+        layout.addWidget(self.sensorSelectedAction , 20, 13, 1, 1)
+        layout.addWidget(self.sensorSelectedActionBox , 20, 14, 1, 1)
+        layout.addWidget(self.fftSize , 21, 13, 1, 1)
+        layout.addWidget(self.fftSizeBox , 21, 14, 1, 1)
+        layout.addWidget(self.fftWindowBox , 22, 14, 1, 1)
+        layout.addWidget(self.welchAction , 23, 14, 1, 1)
+        layout.addWidget(self.fftAllAction , 24, 14, 1, 1)
+        layout.addWidget(self.spectrogramAction , 25, 14, 1, 1)
+        layout.addWidget(self.fftFrequencyLabel , 26, 14, 2, 1)
         
         layout.addWidget(self.textWindow, 36, 4, 3, 12)   
         
@@ -380,7 +521,7 @@ class GUI(QtWidgets.QMainWindow):
         self.show()    
         
         # Serial monitor
-        self.serialMonitor = SerialMonitor(self.delay)
+        self.serialMonitor = SerialMonitor()
         ports = [self.COMports.itemText(i) for i in range(self.COMports.count())]
         
         for i in range(len(self.serialMonitor.ports)):
@@ -388,29 +529,29 @@ class GUI(QtWidgets.QMainWindow):
                     self.COMports.addItem(self.serialMonitor.ports[i])
                     
         if self.serialMonitor.COM != '':
-            self.serialMonitor.serialConnect()
+            self.serialConnect()
             self.liveFromSerialAction.setChecked(True)
             self.dataRecordingAction.setDisabled(False)
             self.sensorsNumber.setDisabled(False)
             self.SignalTypeBox.setDisabled(False)
             self.ADCTypeBox.setDisabled(False)
-            for i in range(6): self.gainBox[i].setDisabled(False)
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(False)
             self.refreshAction.setDisabled(False)
             self.pauseAction.setDisabled(False)   
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "live from " + self.serialMonitor.COM + 
                                             ", baud rate = " + str(self.serialMonitor.baudRate) + " \n")
             self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
             self.COMports.setDisabled(True)  
+            self.devicesButton.setDisabled(True)
  
         self.sensorsNumber.valueChanged.connect(self.setSensorsNumber)       
-        self.mainrun = MainRun(self.delay)
+        self.mainrun = MainRun(self.scheduler)
         self.mainrun.bufferUpdated.connect(self.updateListening, QtCore.Qt.QueuedConnection)  
         
     def liveFromSerial(self):
         if self.liveFromSerialAction.isChecked():
-            self.refresh()
-            self.serialMonitor.serialConnect()
-            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "live from " + self.serialMonitor.COM + 
+            self.serialConnect()
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "live from " + ", ".join([self.serialMonitor.COM] + self.extraPorts) + 
                                             ", baud rate = " + str(self.serialMonitor.baudRate) + " \n")
             self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
             self.PlaybackAction.setChecked(False)
@@ -419,29 +560,83 @@ class GUI(QtWidgets.QMainWindow):
             self.dataRecordingAction.setDisabled(False)
             self.dataRecordingAction.setChecked(False) 
             self.COMports.setDisabled(True)
+            self.devicesButton.setDisabled(True)
             self.slider.setDisabled(True)
             self.slider.setFixedWidth(40)
             self.sensorsNumber.setDisabled(False)
             self.SignalTypeBox.setDisabled(False)
             self.ADCTypeBox.setDisabled(False)
-            for i in range(6): self.gainBox[i].setDisabled(False)
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(False)
             time.sleep(1) 
             self.setSensorsNumber(self.sensorsNumber.value())
             
         else:
             self.refresh()
-            self.serialMonitor.serialDisconnection()
-            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "live stopped\n")
+            text = "live stopped"
+            if self.deviceManager is not None:
+                text += ": " + str(self.deviceManager.counter('frames')) + " frames, " + str(self.deviceManager.counter('dropped')) + " damaged, " + \
+                        str(self.deviceManager.counter('gaps')) + " time gaps, " + str(self.deviceManager.counter('lost')) + " samples lost"
+                if self.deviceManager.stalls > 0: text += ", " + str(self.deviceManager.stalls) + " updates without all devices"
+            self.serialDisconnection()
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + text + "\n")
             self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
             self.refreshAction.setDisabled(True)   
             self.pauseAction.setDisabled(True)
             self.dataRecordingAction.setDisabled(True)
             self.dataRecordingAction.setChecked(False)
             self.COMports.setDisabled(False)
+            self.devicesButton.setDisabled(False)
             self.sensorsNumber.setDisabled(True)
             self.SignalTypeBox.setDisabled(True)
             self.ADCTypeBox.setDisabled(True)
-            for i in range(6): self.gainBox[i].setDisabled(True)
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(True)
+          
+    # Open serial ports of selected devices and start acquisition threads
+    def serialConnect(self):
+        self.serialMonitor.serialConnect()
+        if self.deviceManager is None:
+            serialMonitors = [self.serialMonitor]
+            for port in self.extraPorts:
+                if port == self.serialMonitor.COM or port not in self.serialMonitor.ports: continue
+                serialMonitors.append(SerialMonitor())
+                serialMonitors[-1].COM = port
+                serialMonitors[-1].serialConnect()
+            self.deviceManager = DeviceManager(serialMonitors, int(self.sensorsNumber.value()))
+            if self.streamServer is not None: self.deviceManager.addListener(self.streamServer.listener)
+            self.deviceManager.start()
+            self.devicesNumber = len(serialMonitors)
+        self.refresh()
+    
+    # Stop acquisition threads and close serial ports
+    def serialDisconnection(self):
+        if self.deviceManager is not None:
+            self.deviceManager.stop()
+            self.deviceManager = None
+        if len(self.lostSamples) > 0:
+            self.reportLosses()
+        self.serialMonitor.serialDisconnection()
+    
+    # Fill menu of additional devices with ports other than selected one
+    def updateDevicesMenu(self):
+        self.devicesMenu.clear()
+        for port in self.serialMonitor.ports:
+            if port == self.COMports.currentText(): continue
+            action = self.devicesMenu.addAction(port)
+            action.setCheckable(True)
+            action.setChecked(port in self.extraPorts)
+            action.setEnabled(port in self.extraPorts or len(self.extraPorts) < DEVICES_MAX - 1)
+    
+    # Add or remove port of additional device
+    def selectDevices(self, action):
+        if action.isChecked(): self.extraPorts.append(action.text())
+        elif action.text() in self.extraPorts: self.extraPorts.remove(action.text())
+        self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "additional devices: " + 
+                                        (", ".join(self.extraPorts) if len(self.extraPorts) > 0 else "none") + "\n")
+        self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+    
+    # Number of plotted channels: sensors number of each device
+    def channelsNumber(self):
+        return int(self.sensorsNumber.value())*self.devicesNumber
           
     # Start working
     def start(self):
@@ -455,6 +650,7 @@ class GUI(QtWidgets.QMainWindow):
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "pause ON" + "\n")
             self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
         else:
+            self.playbackClock.start()
             self.mainrun.running = True
             self.mainrun.start()
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "pause OFF" + "\n")
@@ -462,16 +658,17 @@ class GUI(QtWidgets.QMainWindow):
 
     # Refresh data
     def refresh(self):
-        self.l = 0
         self.sampleNum = 0
-        self.Time = [0]*self.dataWidth
-        self.Data = np.full((6, self.dataWidth), 2**(int(self.ADCTypeBox.currentText()))*0.5*0.986)
-        self.DataEnvelope = np.zeros((6, self.dataWidth))
-        self.msg_end = bytearray([0])     
-        self.ms_len =  0
+        self.Data = RingBuffer(SENSORS_MAX*self.devicesNumber, self.dataWidth, fill=2**(int(self.ADCTypeBox.currentText()))*0.5*0.986)
+        self.DataFiltered = RingBuffer(SENSORS_MAX*self.devicesNumber, self.dataWidth, timed=False)
+        self.DataEnvelope = RingBuffer(SENSORS_MAX*self.devicesNumber, self.dataWidth, timed=False)
+        self.timeOrigin = None
+        self.pipeline.reset()
+        self.ms_len = self.dataWidth # Whole data window will be filtered again
         self.slider.setValue(0)
-        self.MovingAverage = MovingAverage()
-        self.FFT = np.zeros((6, 2000))
+        self.spectrum.reset()
+        self.spectrogram.reset()
+        self.featuresFileTime = -np.inf # Time starts again
         self.xRangeStart = 0
 
     # Refresh screen
@@ -486,33 +683,29 @@ class GUI(QtWidgets.QMainWindow):
             self.sensorsNumber.setDisabled(True)
             self.SignalTypeBox.setDisabled(True)
             self.ADCTypeBox.setDisabled(True)
-            for i in range(6): self.gainBox[i].setDisabled(True)
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(True)
             self.refreshAction.setDisabled(True)  
             self.pauseAction.setDisabled(True)  
             
-            self.recordingFileName_TXT = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".txt"
-            self.recordingFileName_BIN = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + ".bin"
+            fileName = datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
+            self.recordingFileName_TXT = fileName + ".txt"
+            self.recordingFileName_BIN = fileName + ".bin"
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "recording to \"" + os.getcwd() +"\\" + self.recordingFileName_BIN + "\"\n")
             self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
 
-            self.recordingFile_TXT = open(self.recordingFileName_TXT, "a") # Data file creation
-            self.recordingFile_TXT.write(datetime.now().strftime("Date: %Y.%m.%d\rTime: %H:%M:%S") + "\r\n") # Data file name
-            self.recordingFile_TXT.write("File format: \r\ntime in s | 6 sensor data points in in mkV\r\n") # Data file format
-
-            
-            self.recordingFile_BIN = open(self.recordingFileName_BIN, 'ab')                  
-            bin_data = struct.pack("H H H H H H H H", (int(self.ADCTypeBox.currentText())), int(self.fs), int(self.gainBox[0].currentIndex()),
-                                   int(self.gainBox[1].currentIndex()), int(self.gainBox[2].currentIndex()), int(self.gainBox[3].currentIndex()),
-                                   int(self.gainBox[4].currentIndex()), int(self.gainBox[5].currentIndex()))
-            self.recordingFile_BIN.write(bin_data)
+            if self.recordingWriter is not None: self.recordingWriter.close() # Recording was stopped by switching data source
+            self.recordingWriter = RecordingWriter(fileName, self.channelsNumber(), int(self.ADCTypeBox.currentText()), self.fs, 
+                                                   [int(self.gainBox[i].currentIndex()) for i in range(self.channelsNumber())])
+            self.recordingStalls = 0
+            self.recordingWriter.start()
         else:
             if not self.PlaybackAction.isChecked():
                 self.refreshAction.setDisabled(False)
                 self.SignalTypeBox.setDisabled(False)
                 self.ADCTypeBox.setDisabled(False)
-                for i in range(6): self.gainBox[i].setDisabled(False)
-            self.recordingFile_TXT.close()
-            self.recordingFile_BIN.close()
+                for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(False)
+            self.recordingWriter.close()
+            self.recordingWriter = None
             self.pauseAction.setDisabled(False)
             self.sensorsNumber.setDisabled(False)            
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "recording stopped. Result file: \"" + os.getcwd() + self.recordingFileName_BIN + "\"\n")
@@ -527,7 +720,7 @@ class GUI(QtWidgets.QMainWindow):
             self.pauseAction.setDisabled(False)
             self.SignalTypeBox.setDisabled(False)
             self.ADCTypeBox.setDisabled(False)
-            for i in range(6): self.gainBox[i].setDisabled(False)
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(False)
         self.recordingFileName_TXT = ''
         path = QtWidgets.QFileDialog.getOpenFileName(self, 'Open a file', '',
                                         'All Files (*.bin*)')
@@ -544,11 +737,12 @@ class GUI(QtWidgets.QMainWindow):
             self.dataRecordingAction.setChecked(False)
             self.slider.setDisabled(False)
             self.slider.setFixedWidth(300)
+            self.playbackSpeedBox.setDisabled(False)
             if self.liveFromSerialAction.isChecked():
                 self.liveFromSerialAction.setChecked(False)
             self.refresh()
             self.liveFromSerialAction.setChecked(False)
-            self.serialMonitor.serialDisconnection()
+            self.serialDisconnection()
             self.dataRecordingAction.setDisabled(False)  
             self.refreshAction.setDisabled(True) 
             self.pauseAction.setDisabled(False)  
@@ -556,35 +750,51 @@ class GUI(QtWidgets.QMainWindow):
             self.sensorsNumber.setDisabled(False)
             self.SignalTypeBox.setDisabled(False)
             self.ADCTypeBox.setDisabled(True)
-            for i in range(6): self.gainBox[i].setDisabled(True)
-            
-            self.loadFile = open(self.loadFileName, 'r')
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(True)
             
-            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "playback from: " + self.loadFileName + "\n")
-            self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
-            
-            self.loadFile = open(self.loadFileName, 'rb')
+            try:
+                self.loadFile = openRecording(self.loadFileName)
+            except (OSError, ValueError) as error:
+                self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "playback is not possible: " + str(error) + "\n")
+                self.PlaybackAction.setChecked(False)
+                self.Playback()
+                return
+            self.loadDataLen = self.loadFile.length
             
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "playback from: " + self.loadFileName + "\n")
+            events = self.loadFile.readEvents()
+            if len(events) > 0:
+                self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "recording has " + str(len(events)) + " sample losses, " + 
+                                                str(int(events['lost'].sum())) + " samples lost\n")
             self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
             
-            self.loadData = self.loadFile.read()
-            self.loadDataLen = int((len(self.loadData)-2*8)/6/2)
-            self.loadFile.close() 
-            
-            data = struct.unpack("H H H H H H H H", self.loadData[0:16])
-            self.ADCTypeBox.setCurrentIndex(int((data[0]/2-4)))
-            self.fs = data[1]
-            for i in range(0, 6):
-                self.gainBox[i].setCurrentIndex(int(data[i+2]))
+            self.ADCTypeBox.setCurrentIndex(int((self.loadFile.ADCbits/2-4)))
+            self.fs = self.loadFile.fs
+            self.pwFFT.setLabel('bottom', 'Frequency (Hz). ' + 'Sampling frequency = ' + str(int(self.fs)) + ' Hz.')
+            for i in range(0, min(self.loadFile.channels, CHANNELS_MAX)):
+                self.gainBox[i].setCurrentIndex(self.loadFile.gains[i])
+            self.devicesNumber = min(-(-self.loadFile.channels//SENSORS_MAX), DEVICES_MAX)
+            if self.loadFile.version > 1:
+                self.sensorsNumber.setValue(-(-self.loadFile.channels//self.devicesNumber))
+            self.setSensorsNumber(self.sensorsNumber.value())
             self.dt = 1/self.fs
             self.dataWidth = int((self.timeWidth + 2)/self.dt)
             self.sliderpos = 0
+            self.playbackClock = PlaybackClock(self.fs, PLAYBACK_SPEEDS[self.playbackSpeedBox.currentIndex()])
+            self.overviewAction.setDisabled(False)
             self.refresh()
             
         else:
+            if self.overviewWindow is not None:
+                self.overviewWindow.close()
+                self.overviewWindow = None
+            if self.loadFile is not None:
+                self.loadFile.close()
+                self.loadFile = None
             self.slider.setDisabled(True)
             self.slider.setFixedWidth(40)
+            self.playbackSpeedBox.setDisabled(True)
+            self.overviewAction.setDisabled(True)
             self.refresh()
             self.dataRecordingAction.setDisabled(True)
             self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "playback stopped \n")
@@ -593,10 +803,11 @@ class GUI(QtWidgets.QMainWindow):
             self.sensorsNumber.setDisabled(True)
             self.SignalTypeBox.setDisabled(True)
             self.ADCTypeBox.setDisabled(True)
-            for i in range(6): self.gainBox[i].setDisabled(True)
+            for i in range(CHANNELS_MAX): self.gainBox[i].setDisabled(True)
 
     # Update
     def updateListening(self):
+        self.profiler.begin()
         if (not self.liveFromSerialAction.isChecked()):
             self.serialMonitor.updatePorts()
                    
@@ -621,6 +832,7 @@ class GUI(QtWidgets.QMainWindow):
         else:
             if self.liveFromSerialAction.isChecked(): self.COMports.setDisabled(True)
             else: self.COMports.setDisabled(False)
+            self.devicesButton.setDisabled(self.liveFromSerialAction.isChecked())
             self.liveFromSerialAction.setDisabled(False)
         
         if self.passLowFreq.value() > self.passHighFreq.value(): self.passLowFreq.setValue(self.passHighFreq.value())
@@ -641,9 +853,9 @@ class GUI(QtWidgets.QMainWindow):
             
         if self.EnvelopeSignalAction.isChecked():
             self.envelopeSmoothingСoefficient.setDisabled(False)
-            self.MovingAverage.MA_alpha = self.envelopeSmoothingСoefficient.value()
         else:
             self.envelopeSmoothingСoefficient.setDisabled(True)
+        self.profiler.mark('ui')
         
         # Read data from File               
         if (self.PlaybackAction.isChecked() and self.loadFileName != ''):
@@ -653,219 +865,375 @@ class GUI(QtWidgets.QMainWindow):
         if (self.liveFromSerialAction.isChecked()):
             self.readFromSerial()
         
-        while self.sensorSelectedActionBox.count() < int(self.sensorsNumber.value()): 
+        while self.sensorSelectedActionBox.count() < self.channelsNumber(): 
             self.sensorSelectedActionBox.addItem(str(self.sensorSelectedActionBox.count() + 1))
             
-        while self.sensorSelectedActionBox.count() > int(self.sensorsNumber.value()): 
+        while self.sensorSelectedActionBox.count() > self.channelsNumber(): 
             self.sensorSelectedActionBox.removeItem(self.sensorSelectedActionBox.count()-1)
+        self.profiler.mark('ui')
         
         # Filtering
         if (self.PlaybackAction.isChecked() and self.loadFileName != '') or (self.liveFromSerialAction.isChecked()):
-            Data = np.zeros((6, self.dataWidth))
-            Time = np.zeros((6, self.dataWidth))
-            
-            for i in range( int(self.sensorsNumber.value()) ):
-                Data[i] = np.concatenate((self.Data[i][self.l: self.dataWidth], self.Data[i][0: self.l]))
-                Time = np.concatenate((self.Time[self.l: self.dataWidth], self.Time[0: self.l]))
+            self.updateFilter()
             
-                if self.bandstopAction.isChecked():
-                    if (self.notchActiontypeBox.currentText() == "50 Hz"): 
-                        for j in range(int(self.fs//100)-3): Data[i] = self.butter_bandstop_filter(Data[i], 45 + j*50, 55 + j*50, self.fs)
-                    if (self.notchActiontypeBox.currentText() == "60 Hz"):
-                        for j in range(int(self.fs//120)-3): Data[i] = self.butter_bandstop_filter(Data[i], 55 + j*60, 65 + j*60, self.fs)
-                    if not (self.bandpassAction.isChecked()) :
-                        for j in range(int(int(0.5/self.dt))): Data[i][j] = 2**(int(self.ADCTypeBox.currentText()))*0.5*0.986
-                                
-                if (self.bandpassAction.isChecked()) :
-                    Data[i] = self.butter_bandpass_filter(Data[i], self.passLowFrec, self.passHighFrec, self.fs)
-                    for j in range(int(int(0.5/self.dt))): Data[i][j] = 0
-                
-            
-                # Shift the boundaries of the graph
-                self.pw[i].setXRange(self.xRangeStart + self.timeWidth*((self.Time[self.l - 1] - self.xRangeStart)// self.timeWidth), 
-                                     self.xRangeStart + self.timeWidth*((self.Time[self.l - 1] - self.xRangeStart) // self.timeWidth + 1))
-                
-                # Plot raw
-                if  self.rawSignalAction.isChecked(): 
-                    if (self.SignalTypeBox.currentIndex() == 0 ): self.p[i].setData(y=Data[i], x=Time)
-                    else: 
-                        ADCmax = (2**(int(self.ADCTypeBox.currentText())) - 1)
-                        coefficient = 5000/ADCmax/int(self.gainBox[i].currentText())
-                        if (self.bandpassAction.isChecked()) : self.p[i].setData(y=Data[i]*coefficient, x=Time)
-                        else: self.p[i].setData(y=(Data[i] - ADCmax*0.5*0.986)*coefficient, x=Time)
-                else: self.p[i].clear()
-                
-                # Plot envelope data
-                self.DataEnvelope[i][0: self.dataWidth - self.ms_len] = self.DataEnvelope[i][self.ms_len:self.dataWidth]
-                for j in range (self.dataWidth - self.ms_len, self.dataWidth):
-                    if (self.bandpassAction.isChecked()) : self.DataEnvelope[i][j] = self.MovingAverage.movingAverage(i, Data[i][j])
-                    else: self.DataEnvelope[i][j] = self.MovingAverage.movingAverage(i, Data[i][j] - 2**(int(self.ADCTypeBox.currentText()))*0.5*0.986)
-                
-                if  self.EnvelopeSignalAction.isChecked(): 
-                    if (self.SignalTypeBox.currentIndex() == 0 ):
-                        if (self.bandpassAction.isChecked()) : self.pe[i].setData(y=self.DataEnvelope[i], x=Time)
-                        else: self.pe[i].setData(y=self.DataEnvelope[i] + 2**(int(self.ADCTypeBox.currentText()))*0.5*0.986, x=Time)
-                    else: 
-                        ADCmax = (2**(int(self.ADCTypeBox.currentText())) - 1)
-                        coefficient = 4931.0/ADCmax/int(self.gainBox[i].currentText())
-                        self.pe[i].setData(y=self.DataEnvelope[i]*coefficient, x=Time)
-                else: self.pe[i].clear()
-                    
-                # Plot histogram
-                self.pb[i].setOpts(height = 2*self.DataEnvelope[i][-1])
+            # Pipeline runs only for samples received since previous update
+            self.ms_len = min(self.ms_len, self.dataWidth)
+            self.pipeline.process(self.Data.latest(self.ms_len)[0])
+            self.profiler.mark('pipeline')
+            self.DataFiltered.write(self.pipeline.signal())
+            self.DataEnvelope.write(self.pipeline.envelope())
+            self.profiler.mark('buffer')
+            self.updateFeatures()
+            self.profiler.mark('features')
             
-            for i in range( int(self.sensorsNumber.value()), 6):
-                self.p[i].clear()
-                self.pe[i].clear()
-                self.pb[i].setOpts(height=0)
-
-            self.ms_len = 0       
+            self.profiler.value('samples', self.ms_len)
+            self.ms_len = 0
             
-            # Plot FFT data
-            Y = np.zeros((6, 2000))
-            i = int(self.sensorSelectedActionBox.currentIndex())
-            Y[i] = abs(fft(Data[i][-2001: -1]))/2000
-            self.FFT[i] = (1-0.5)*Y[i] + 0.5*self.FFT[i]
-            X = self.fs*np.linspace(0, 1, 2000)
-            sensor = self.sensorSelectedActionBox.currentIndex()
-            self.pFFT.setData(y=self.FFT[sensor][2: int(len(self.FFT[sensor])/2)], x=X[2: int(len(X)/2)])
+            if self.renderFrame:
+                self.updatePlots()
+                self.renderTime = time.monotonic()
+            self.renderFrame = True
         else:
-            for i in range(int(self.sensorsNumber.value())):
+            for i in range(self.channelsNumber()):
                 self.p[i].clear()
                 self.pe[i].clear()
                 self.pb[i].setOpts(height=0)
+                self.pFeatures[i].clear()
             self.pFFT.clear()
+            for i in range(CHANNELS_MAX): self.pFFTAll[i].clear()
+        
+        # Frame is rendered when event loop gets back to posted events
+        QtCore.QTimer.singleShot(0, self.scheduler.done)
+        
+        self.profiler.end()
+        if self.profiler.enabled and time.monotonic() - self.profilerReport > PROFILER_REPORT:
+            self.profilerReport = time.monotonic()
+            self.reportProfiler()
+    
+    # Features of samples processed by pipeline in this update (zero-centered envelope input), whole window is
+    # processed again after pipeline change. Only rows after the last written one go to features file.
+    def updateFeatures(self):
+        samples, times = self.pipeline.inputs['envelope'], self.Data.latest(self.ms_len)[1]
+        if self.ms_len >= self.dataWidth or self.featuresData.channels != len(FEATURES)*len(samples):
+            self.features.reset()
+            self.featuresData = RingBuffer(len(FEATURES)*len(samples), self.dataWidth//FEATURES_HOP + 1)
+        times, values = self.features.process(samples, times)
+        if len(times) == 0:
+            return
+        self.featuresData.write(np.transpose(values, (2, 1, 0)).reshape(-1, len(times)), times)
+        if self.featuresWriter is not None:
+            new = times > self.featuresFileTime
+            self.featuresWriter.write(times[new], values[new])
+            self.featuresFileTime = times[-1]
+    
+    # Update plots with data window
+    def updatePlots(self):
+        Time = self.Data.latest(self.dataWidth)[1]
+        # Plots get min/max of samples for each pixel column, instead of all window samples
+        bucket = int(self.timeWidth*self.fs/max(1, self.pw[0].width()))
+        index, Data = self.rawDecimator.process(self.DataFiltered, self.dataWidth, bucket)
+        TimeRaw = Time[index]
+        index, DataEnvelope = self.envelopeDecimator.process(self.DataEnvelope, self.dataWidth, bucket)
+        TimeEnvelope = Time[index]
+        self.profiler.mark('decimate')
+        
+        histogram = 2*self.pipeline.envelopeADC(self.DataEnvelope.latest(1)[0][:, 0]) # Histogram bars, envelope in ADC units in all modes
+        for i in range(self.channelsNumber()):
+            # Shift the boundaries of the graph
+            self.pw[i].setXRange(self.xRangeStart + self.timeWidth*((Time[-1] - self.xRangeStart)// self.timeWidth), 
+                                 self.xRangeStart + self.timeWidth*((Time[-1] - self.xRangeStart) // self.timeWidth + 1))
+            
+            # Plot raw (filtered and scaled by pipeline)
+            if  self.rawSignalAction.isChecked(): self.p[i].setData(y=Data[i], x=TimeRaw)
+            else: self.p[i].clear()
+            
+            # Plot envelope data, envelope of ADC data without bandpass is drawn around ADC midpoint as raw data
+            if  self.EnvelopeSignalAction.isChecked(): 
+                if self.pipeline['offset'].enabled and not self.pipeline['scale'].enabled: 
+                    self.pe[i].setData(y=DataEnvelope[i] + self.pipeline['offset'].value, x=TimeEnvelope)
+                else: self.pe[i].setData(y=DataEnvelope[i], x=TimeEnvelope)
+            else: self.pe[i].clear()
+                
+            # Plot histogram
+            self.pb[i].setOpts(height = histogram[i])
+        
+        for i in range(self.channelsNumber(), CHANNELS_MAX):
+            self.p[i].clear()
+            self.pe[i].clear()
+            self.pb[i].setOpts(height=0)
+            self.pFeatures[i].clear()
+        
+        # Plot selected feature of each sensor
+        values, times = self.featuresData.latest(min(self.featuresData.count, self.featuresData.capacity))
+        rows = self.featuresData.channels//len(FEATURES)
+        for i in range(self.channelsNumber()):
+            self.pFeatures[i].setData(y=values[self.featureBox.currentIndex()*rows + i], x=times)
+        self.profiler.mark('plots')
+        
+        # Plot FFT data
+        self.spectrum.configure(FFT_SIZES[self.fftSizeBox.currentIndex()], FFT_WINDOWS[self.fftWindowBox.currentIndex()], 
+                                8 if self.welchAction.isChecked() else 1, self.fs)
+        Data = self.DataFiltered.latest(min(self.spectrum.length(), self.dataWidth))[0]
+        if self.fftAllAction.isChecked():
+            sensors = list(range(self.channelsNumber()))
+            self.pFFT.clear()
+        else:
+            sensors = [int(self.sensorSelectedActionBox.currentIndex())]
+            for i in range(CHANNELS_MAX): self.pFFTAll[i].clear()
+        amplitude = self.spectrum.process(Data[sensors])
+        if self.fftAllAction.isChecked():
+            for i in sensors: self.pFFTAll[i].setData(y=amplitude[i][2:], x=self.spectrum.freqs[2:])
+            for i in range(len(sensors), CHANNELS_MAX): self.pFFTAll[i].clear()
+        else: self.pFFT.setData(y=amplitude[0][2:], x=self.spectrum.freqs[2:])
+        
+        # Mean and median frequency of selected sensor
+        MNF, MDF = self.spectrum.frequencies(self.passLowFrec, self.passHighFrec)
+        k = sensors.index(self.sensorSelectedActionBox.currentIndex()) if self.sensorSelectedActionBox.currentIndex() in sensors else 0
+        self.fftFrequencyLabel.setText('MNF: ' + str(int(MNF[k])) + ' Hz\nMDF: ' + str(int(MDF[k])) + ' Hz')
+        self.profiler.mark('fft')
+        
+        # Plot new spectrogram columns
+        if self.spectrogramAction.isChecked():
+            if self.spectrogram.configure(256, 64, int(self.timeWidth*self.fs/64), FFT_WINDOWS[self.fftWindowBox.currentIndex()], self.fs):
+                self.spectrogramImage.setRect(QtCore.QRectF(0, 0, self.spectrogram.columns*self.spectrogram.hop/self.fs, self.fs/2))
+                self.pwSpectrogram.setRange(xRange=(0, self.spectrogram.columns*self.spectrogram.hop/self.fs), yRange=(0, self.fs/2), padding=0)
+            if self.spectrogram.process(self.DataFiltered, self.Data.count, int(self.sensorSelectedActionBox.currentIndex())) > 0:
+                self.spectrogramImage.setImage(self.spectrogram.image, autoLevels=False, levels=(self.spectrogram.peak - 60, self.spectrogram.peak))
+                self.spectrogramLine.setValue((self.spectrogram.position() + 1)*self.spectrogram.hop/self.fs)
+        self.profiler.mark('spectrogram')
+    
+    # Switch profiler, trace is saved to CSV file when profiler is switched off
+    def profiling(self):
+        if self.profilerAction.isChecked():
+            self.profiler.reset()
+            self.profiler.enabled = True
+            self.profilerReport = time.monotonic()
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "profiler ON\n")
+        else:
+            self.profiler.enabled = False
+            if self.profiler.count > 0:
+                fileName = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + "_profile.csv"
+                self.profiler.save(fileName)
+                self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "profiler OFF. Trace file: \"" + os.getcwd() + "\\" + fileName + "\"\n")
+            else:
+                self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "profiler OFF\n")
+        self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+    
+    # Print profiler statistics of last ticks: median/95th percentile of stage times, frame rate, histogram of update time
+    def reportProfiler(self):
+        if self.profiler.count == 0:
+            return
+        ticks = int(PROFILER_REPORT/self.scheduler.interval())
+        interval = self.profiler.percentiles('interval', (50,), ticks)[0]
+        text = "update " + str(round(1/interval, 1) if interval > 0 else 0) + " fps (target " + str(self.scheduler.fps) + ", sustainable " + \
+               str(round(1/self.scheduler.interval(), 1)) + ", frame cost " + str(round(self.scheduler.cost*1e3, 1)) + " ms)"
+        total = self.profiler.percentiles('total', (50, 95), ticks)*1e3
+        text += ", tick " + str(round(total[0], 1)) + "/" + str(round(total[1], 1)) + " ms:"
+        for stage in self.profiler.stages:
+            p = self.profiler.percentiles(stage, (50, 95), ticks)*1e3
+            if p[1] >= 0.05: text += " " + stage + " " + str(round(p[0], 1)) + "/" + str(round(p[1], 1))
+        histogram = self.profiler.histogram('total', PROFILER_HISTOGRAM, ticks)
+        text += "; ticks <" + "/<".join(str(int(edge*1e3)) for edge in PROFILER_HISTOGRAM) + "/more ms: " + "/".join(str(n) for n in histogram)
+        samples = self.profiler.percentiles('samples', (50,), ticks)[0]
+        text += "; " + str(int(samples)) + " samples/tick"
+        if self.liveFromSerialAction.isChecked():
+            text += ", serial backlog " + str(int(self.profiler.percentiles('backlog', (95,), ticks)[0])) + " B"
+            lost = self.profiler.latest()[-ticks:, self.profiler.column['lost']].sum()
+            if lost > 0: text += ", " + str(int(lost)) + " samples lost"
+        self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + text + "\n")
+        self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+    
+    # Change playback speed multiplier
+    def setPlaybackSpeed(self, index):
+        self.playbackClock.speed = PLAYBACK_SPEEDS[index]
     
     def setGain(self):
         if self.liveFromSerialAction.isChecked():
-            for i in range(int(self.sensorsNumber.value())):
-                self.serialMonitor.ser.write(bytearray([(i + 1)*10 + int(self.gainBox[i].currentIndex())]))
+            for i in range(self.channelsNumber()):
+                self.deviceManager.setGain(i, int(self.gainBox[i].currentIndex()))
             self.setSensorsNumber(self.sensorsNumber.value())
     
     # Read data from File   
     def readFromFile(self):
-        j = 0
-        while j < 100:
-            j += 1
+        if ( self.sliderpos > self.loadDataLen - 2):
+            self.refresh()
+            self.sliderpos = 0
+            self.slider.setValue(0)
+            self.xRangeStart = 0
         
-            if ( self.l == self.dataWidth):
-                self.l = 0
-            
-            if ( self.sliderpos > self.loadDataLen - 2):
-                self.refresh()
-                self.sliderpos = 0
-                self.slider.setValue(0)
-                self.xRangeStart = 0
-                    
-            unpeck_b = struct.unpack("H H H H H H", self.loadData[(16 + self.sliderpos*6*2):(16 + (self.sliderpos+1)*6*2)])
-            for i in range(6): self.Data[i][self.l] = unpeck_b[i] 
-            
-            if (self.dataRecordingAction.isChecked()):
-                bin_data = struct.pack("H H H H H H", int(self.Data[0][self.l]), int(self.Data[1][self.l]), int(self.Data[2][self.l]), 
-                                       int(self.Data[3][self.l]), int(self.Data[4][self.l]), int(self.Data[5][self.l]))
-                self.recordingFile_BIN.write(bin_data)
-                
-                sensors_data = str(round(self.Time[self.l], 3))
-                for i in range(6): sensors_data += (" " + str(round(self.Data[i][self.l], 3)))
-                self.recordingFile_TXT.write(sensors_data + " \n")
-                                                       
-            if ((self.slider.value() != int(self.sliderpos/self.loadDataLen*100))):
-                self.sliderpos += int(self.slider.value()*self.loadDataLen/100 - self.sliderpos)
-                temp = self.l
-                self.refresh()
-                self.l = temp
-                self.Time[self.l] = self.sliderpos*self.dt
-                self.xRangeStart = self.Time[self.l]
-          
-            
-            self.Time[self.l] = self.sliderpos*self.dt
-            self.l = self.l + 1
-            self.ms_len += 1
-            
-            self.sliderpos += 1
-            self.slider.setValue(int(self.sliderpos/self.loadDataLen*100))
+        # Jump to new slider position
+        if ((self.slider.value() != int(self.sliderpos/self.loadDataLen*100))):
+            self.sliderpos = int(self.slider.value()*self.loadDataLen/100)
+            self.refresh()
+            self.xRangeStart = self.sliderpos*self.dt
+        
+        # Samples for real time elapsed since previous frame (at most one data window),
+        # plots are not updated while playback is behind
+        samples, times = self.loadFile.read(self.sliderpos, min(self.playbackClock.advance(), self.dataWidth))
+        if len(samples) != self.Data.channels:
+            samples = np.concatenate((samples, np.zeros((self.Data.channels, len(times)), samples.dtype)))[:self.Data.channels]
+        self.renderFrame = self.playbackClock.interval < 2*self.scheduler.interval() or time.monotonic() - self.renderTime > 0.5
+        self.profiler.mark('read')
+        self.Data.write(samples, times)
+        self.profiler.mark('buffer')
         
+        if (self.dataRecordingAction.isChecked()):
+            self.recordData(samples, times)
+            self.profiler.mark('record')
+        
+        self.ms_len += len(times)
+        self.sliderpos += len(times)
+        self.slider.setValue(int(self.sliderpos/self.loadDataLen*100))
+        if self.overviewWindow is not None and len(times) > 0:
+            self.overviewWindow.position.setValue(times[-1])
+    
+    # Open overview of playback file, overview file is built at first opening
+    def showOverview(self):
+        if self.overviewWindow is None:
+            start = time.perf_counter()
+            overview = RecordingOverview(self.loadFile)
+            if overview.built:
+                self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "overview file built in " + 
+                                                str(round(time.perf_counter() - start, 1)) + " s: " + overview.fileName + "\n")
+                self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+            self.overviewWindow = OverviewWindow(overview, self.seekPlayback)
+        self.overviewWindow.show()
+        self.overviewWindow.raise_()
+    
+    # Continue playback from sample number
+    def seekPlayback(self, sample):
+        self.sliderpos = min(max(sample, 0), self.loadDataLen - 2)
+        self.refresh()
+        self.xRangeStart = self.sliderpos*self.dt
+        self.slider.setValue(int(self.sliderpos/self.loadDataLen*100))
+        
+    # Show samples lost since previous report in text window, one line per loss kind
+    def reportLosses(self):
+        for kind in sorted(self.lostSamples):
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + str(self.lostSamples[kind]) + 
+                                            " samples lost: " + LOSS_NAMES[kind] + "\n")
+        self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+        self.lostSamples = {}
+    
     # Read data from serial                  
     def readFromSerial(self): 
-        msg = self.serialMonitor.serialRead()
+        if self.deviceManager.connect == False:
+            self.refresh()
         
-        if self.serialMonitor.connect == False:
+        # Samples collected by acquisition threads since previous update, aligned in time
+        samples, times, events = self.deviceManager.read()
+        self.profiler.value('backlog', self.deviceManager.backlog())
+        self.profiler.value('lost', sum(event[1] for event in events))
+        self.profiler.mark('read')
+        for event in events:
+            self.lostSamples[event[2]] = self.lostSamples.get(event[2], 0) + event[1]
+        if len(self.lostSamples) > 0 and time.monotonic() - self.lossReport > LOSS_REPORT:
+            self.lossReport = time.monotonic()
+            self.reportLosses()
+        if len(times) == 0 or self.deviceManager.dt <= 0:
+            return
+        
+        self.dt = self.deviceManager.dt
+        if (abs(1/self.dt-self.fs) > 50) and (1/self.dt > 1000):
+            self.fs = 1/self.dt
+            self.dataWidth = int((self.timeWidth + 1)/self.dt)
+            self.pwFFT.setLabel('bottom', 'Frequency (Hz). ' + 'Sampling frequency = ' + str(int(self.fs)) + ' Hz.')
             self.refresh()
         
-        msg_end_n = 0
+        if self.timeOrigin is None:
+            self.timeOrigin = times[0] - self.dt
         
-        for i in range (len(msg)-1, 1, -1):
-            if msg[i] == 0xFF and msg[i-1] == 0xFF:
-                msg_end_n = i
-                break
-            
-        if msg_end_n != len(msg):
-            msg_begin = self.msg_end
-            self.msg_end = msg[msg_end_n+1:len(msg)]
-            msg = msg_begin + msg[0:msg_end_n]
-        
-        # Parsing data from serial buffer
-        if len(msg) >= 2 and (len(msg)+1)%(16) == 0:
-            for i in range(0, len(msg)-1, 16):
-                if ( self.l == self.dataWidth):
-                        self.l = 0
-                for j in range(6):
-                    self.Data[j][self.l] =(int(msg[i+j*2] | msg[i+j*2+1] << 8))
-            
-                self.dt = (int(msg[i+12] | msg[i+13] << 8))/1000000 
-                if (abs(1/self.dt-self.fs) > 50) and (1/self.dt > 1000):
-                    self.fs = 1/self.dt
-                    self.dataWidth = int((self.timeWidth + 1)/self.dt)
-                    self.pwFFT.setLabel('bottom', 'Frequency (Hz). ' + 'Sampling frequency = ' + str(int(self.fs)) + ' Hz.')
-                    self.refresh()
-                
-                self.Time[self.l] = self.Time[self.l - 1] + self.dt
-                
-                if (self.dataRecordingAction.isChecked()):
-                    bin_data = struct.pack("H H H H H H", int(self.Data[0][self.l]), int(self.Data[1][self.l]), int(self.Data[2][self.l]), 
-                                           int(self.Data[3][self.l]), int(self.Data[4][self.l]), int(self.Data[5][self.l]))
-                    self.recordingFile_BIN.write(bin_data)
-                    
-                    sensors_data = str(round(self.Time[self.l], 3))
-                    for i in range(6): sensors_data += (" " + str(round(self.Data[i][self.l], 3)))
-                    self.recordingFile_TXT.write(sensors_data + " \n")
-                
-                self.l += 1
-                self.sampleNum += 1
-                self.ms_len += 1
-        
-    # Butterworth bandpass filter
-    def butter_bandpass_filter(self, data, lowcut, highcut, fs, order=4):
-        nyq = 0.5*fs
-        low = lowcut/nyq
-        high = highcut/nyq
-        b, a = butter(order, [low, high], btype='bandpass')
-        y = lfilter(b, a, data)
-        return y
+        times = times - self.timeOrigin
+        self.Data.write(samples, times)
+        self.profiler.mark('buffer')
+        
+        if (self.dataRecordingAction.isChecked()):
+            self.recordData(samples, times, events)
+            self.profiler.mark('record')
+        
+        self.sampleNum += len(times)
+        self.ms_len += len(times)
+        
+    # Queue data block (channels, n) and sample losses for writing to recording files
+    def recordData(self, samples, times, events=()):
+        self.recordingWriter.submit(samples, times, events)
+        if self.recordingWriter.stalls > self.recordingStalls:
+            self.recordingStalls = self.recordingWriter.stalls
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "recording queue is full: disk is too slow\n")
+            self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
     
-    # Butterworth bandstop filter
-    def butter_bandstop_filter(self, data, lowcut, highcut, fs, order=4):
-        nyq = 0.5*fs
-        low = lowcut/nyq
-        high = highcut/nyq
-        b, a = butter(order, [low, high], btype='bandstop')
-        y = lfilter(b, a, data)
-        return y
+    # Update pipeline when settings changed, whole data window is processed again
+    def updateFilter(self):
+        mains = 50 if self.notchActiontypeBox.currentText() == "50 Hz" else 60
+        self.pipelineSettings = dict(fs=self.fs, notch=mains if self.bandstopAction.isChecked() else 0, 
+                                     bandpass=(self.passLowFrec, self.passHighFrec) if self.bandpassAction.isChecked() else None, 
+                                     ADCbits=int(self.ADCTypeBox.currentText()), gains=[int(box.currentText()) for box in self.gainBox], 
+                                     alpha=self.envelopeSmoothingСoefficient.value(), microvolts=self.SignalTypeBox.currentIndex() == 1)
+        if self.pipeline.configure(**self.pipelineSettings):
+            self.ms_len = self.dataWidth
+            self.configureStream()
+        bandpass = self.pipelineSettings['bandpass'] or (0, np.inf)
+        if self.features.configure(FEATURES_WINDOW, FEATURES_HOP, self.fs, windowFunction=FFT_WINDOWS[self.fftWindowBox.currentIndex()], 
+                                   low=bandpass[0], high=bandpass[1]):
+            self.ms_len = self.dataWidth
+    
+    # Start or stop writing of EMG features file
+    def featuresRecording(self):
+        if self.featuresFileAction.isChecked():
+            fileName = datetime.now().strftime("%Y_%m_%d_%H_%M_%S") + "_features.csv"
+            self.featuresWriter = FeaturesWriter(fileName, self.channelsNumber())
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "features to \"" + os.getcwd() + "\\" + fileName + "\"\n")
+        else:
+            self.featuresWriter.close()
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "features file closed: " + str(self.featuresWriter.rows) + " rows\n")
+            self.featuresWriter = None
+        self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+    
+    # Start or stop stream server, acquisition threads publish data to it
+    def streaming(self):
+        if self.streamAction.isChecked():
+            try:
+                self.streamServer = StreamServer(sensors=int(self.sensorsNumber.value()), stages=os.environ.get('ELEMYO_PIPELINE', ''))
+            except OSError as error:
+                self.streamAction.setChecked(False)
+                self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "stream port " + str(STREAM_PORT) + " is not available: " + str(error) + "\n")
+                self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+                return
+            self.configureStream()
+            self.streamServer.start()
+            if self.deviceManager is not None: self.deviceManager.addListener(self.streamServer.listener)
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "stream ON: tcp/udp " + self.streamServer.address[0] + ":" + 
+                                            str(self.streamServer.address[1]) + "\n")
+        else:
+            if self.deviceManager is not None: self.deviceManager.removeListener(self.streamServer.listener)
+            self.streamServer.stop()
+            self.textWindow.insertPlainText(datetime.now().strftime("[%H:%M:%S] ") + "stream OFF: " + str(self.streamServer.messages) + " messages sent, " + 
+                                            str(self.streamServer.dropped) + " dropped, " + str(self.streamServer.disconnected) + " slow subscribers disconnected\n")
+            self.streamServer = None
+        self.textWindow.verticalScrollBar().setValue(self.textWindow.verticalScrollBar().maximum()-2)
+    
+    # Same pipeline settings for streamed data as for plots
+    def configureStream(self):
+        if self.streamServer is not None and len(self.pipelineSettings) > 0:
+            self.streamServer.configure(**self.pipelineSettings)
+    
+    # Set target frame rate of graphics updates
+    def setFrameRate(self, fps):
+        self.scheduler.fps = fps
     
     # 
     def setSensorsNumber(self, num):
-        if self.liveFromSerialAction.isChecked() and self.serialMonitor.connect:
-            self.serialMonitor.ser.write(bytearray([int(num)]))
-            self.serialMonitor.ser.flushInput()
+        if self.liveFromSerialAction.isChecked() and self.deviceManager is not None and self.deviceManager.connect:
+            self.deviceManager.setSensorsNumber(num)
             time.sleep(0.1) 
-        self.delay = 0.07 + 0.015*num
-        self.serialMonitor.delay  = self.delay
-        self.mainrun.delay = self.delay
+        if self.streamServer is not None:
+            self.streamServer.setSensorsNumber(num)
+        num = int(num)*self.devicesNumber
         self.pbar.setXRange(num+1, 0.05)
         if self.liveFromSerialAction.isChecked():
             self.refresh()
         
-        for i in range(6):
+        for i in range(CHANNELS_MAX):
             self.row[i].hide()
             self.pw[i].getAxis('bottom').setStyle(showValues=False)
             self.pw[i].showLabel('bottom', 0)
@@ -880,90 +1248,101 @@ class GUI(QtWidgets.QMainWindow):
     # Exit event
     def closeEvent(self, event):
         self.mainrun.running = False
-        self.serialMonitor.serialDisconnection()
+        if self.recordingWriter is not None:
+            self.recordingWriter.close()
+        self.serialDisconnection()
+        if self.streamServer is not None:
+            self.streamServer.stop()
+        if self.featuresWriter is not None:
+            self.featuresWriter.close()
         event.accept()
 
-# Serial monitor class
-class SerialMonitor:
-    # Custom constructor
-    def __init__(self, delay):
-        self.running = False
-        self.connect = False
-        self.baudRate = 250000
-        self.playFile = 0   
-        self.ports = [p[0] for p in serial.tools.list_ports.comports(include_links=False) ]
-        self.COM = ''
-        self.ser = serial.Serial()
-        if len(self.ports) > 0:
-            self.COM = self.ports[0]
-        
-    def updatePorts(self):
-        self.ports = [p[0] for p in serial.tools.list_ports.comports(include_links=False) ]
+# Window with whole recording: min/max and RMS of samples for each pixel column, taken from
+# overview pyramid on every zoom or pan, down to single samples
+class OverviewWindow(QtWidgets.QWidget):
+    # Custom constructor, seek - function called with sample number on double click
+    def __init__(self, overview, seek):
+        super(OverviewWindow, self).__init__()
+        self.overview = overview
+        self.recording = overview.recording
+        self.seek = seek
+        self.setWindowTitle("Overview: " + os.path.basename(self.recording.fileName))
+        self.setWindowIcon(QtGui.QIcon('img/icon.png'))
+        self.setStyleSheet("color: rgb(255, 255, 255); background-color: rgb(13, 13, 13);")
+        self.resize(1200, 150*self.recording.channels)
+        
+        duration = float(self.recording.sampleTime(max(self.recording.length - 1, 0)))
+        layout = QtWidgets.QVBoxLayout()
+        self.pw = [] # Plot widget of each channel
+        self.pMinMax = [] # Min/max curve of each channel
+        self.pRMS = [] # RMS curve of each channel
+        for i in range(self.recording.channels):
+            self.pw.append(pg.PlotWidget(background=(13, 13, 13, 255)))
+            self.pw[i].showGrid(x=True, y=True, alpha=0.7)
+            self.pw[i].setLimits(xMin=0, xMax=duration)
+            self.pMinMax.append(self.pw[i].plot())
+            self.pMinMax[i].setPen(color=(100, 255, 255), width=0.8)
+            self.pRMS.append(self.pw[i].plot())
+            self.pRMS[i].setPen(color=(255, 0, 0), width=1)
+            if i > 0: self.pw[i].setXLink(self.pw[0])
+            self.pw[i].scene().sigMouseClicked.connect(self.mouseClicked)
+            layout.addWidget(self.pw[i])
+        self.pw[-1].setLabel('bottom', 'Time', 's')
+        self.position = pg.InfiniteLine(pen=(255, 255, 255))
+        self.pw[0].addItem(self.position)
+        self.setLayout(layout)
+        
+        self.pw[0].sigXRangeChanged.connect(self.updatePlots)
+        self.pw[0].setXRange(0, duration, padding=0)
+        self.updatePlots()
     
-    def serialConnect(self):
-        self.updatePorts()
-        if not self.connect:
-            if self.COM != '':
-                try:
-                    self.ser = serial.Serial(self.COM, self.baudRate)
-                    self.ser.setDTR(False)
-                    self.ser.setRTS(False)
-                    self.connect = True             
-                    time.sleep(0.1) 
-                    self.ser.flushInput()
-                except SerialException :
-                    self.connect = False
-                    
-    def serialDisconnection(self):
-        self.ser.close()
-        self.connect = False
-        
-    def serialRead(self):          
-        msg = bytes(0)
-        try:
-            msg = self.ser.read( self.ser.inWaiting() )
-            self.connect = True
-        except SerialException :
-            self.connect = False
-            try:
-               self.ser.close()
-               self.ser.open()
-               msg = bytes(0)
-            except SerialException :
-                pass
-            pass
-        return msg
-
-# Moving average class
-class MovingAverage:
-    # Custom constructor
-    def __init__(self):
-        self.MA = np.zeros((6, 3)) 
-        self.MA_alpha = 0.95
+    # Plot statistics of visible time range
+    def updatePlots(self):
+        t0, t1 = self.pw[0].viewRange()[0]
+        start, end = self.recording.seek(t0), self.recording.seek(t1) + 1
+        samples, minimum, maximum, mean, rms = self.overview.query(start, end, self.pw[0].width())
+        Time = self.recording.sampleTime(samples)
+        for i in range(self.recording.channels):
+            if len(samples) > 1 and samples[1] - samples[0] == 1:
+                # Single samples
+                self.pMinMax[i].setData(x=Time, y=minimum[i])
+                self.pRMS[i].clear()
+            else:
+                self.pMinMax[i].setData(x=np.repeat(Time, 2), y=np.stack((minimum[i], maximum[i]), axis=1).reshape(-1))
+                # RMS of signal deviation from its mean, plotted above the mean as envelope in main window
+                self.pRMS[i].setData(x=Time, y=mean[i] + np.sqrt(np.maximum(rms[i]**2 - mean[i]**2, 0)))
     
-    def movingAverage(self, i, data):
-        if data < 0:
-            data = -data
-        self.MA[i][0] = (1 - self.MA_alpha)*data + self.MA_alpha*self.MA[i][0];
-        self.MA[i][1] = (1 - self.MA_alpha)*(self.MA[i][0]) + self.MA_alpha*self.MA[i][1];
-        self.MA[i][2] = (1 - self.MA_alpha)*(self.MA[i][1]) + self.MA_alpha*self.MA[i][2];
-        return self.MA[i][2]*2
+    # Jump of playback to time of double click
+    def mouseClicked(self, event):
+        if event.double():
+            t = self.pw[0].getViewBox().mapSceneToView(event.scenePos()).x()
+            self.seek(self.recording.seek(t))
+    
+    def closeEvent(self, event):
+        self.overview.close()
+        event.accept()
 
-# Serial monitor class
+# Timer thread requesting graphics updates at deadlines of frame scheduler
 class MainRun(QtCore.QThread):
     bufferUpdated = QtCore.pyqtSignal()
     # Custom constructor
-    def __init__(self, delay):
+    def __init__(self, scheduler):
         QtCore.QThread.__init__(self)
         self.running = False
         self.playFile = 0
-        self.delay = delay      
+        self.scheduler = scheduler
 
-    # Listening port
+    # Request frames, at most one request is waiting in GUI event queue
     def run(self):
+        self.scheduler.start()
         while self.running is True:
-            self.bufferUpdated.emit()
-            time.sleep(self.delay) 
+            request, wait = self.scheduler.poll()
+            if request:
+                self.bufferUpdated.emit()
+            elif wait is None:
+                self.scheduler.ready.wait(0.1)
+            else:
+                time.sleep(wait)
          
 # Starting program       
 if __name__ == '__main__':
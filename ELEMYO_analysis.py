@@ -0,0 +1,262 @@
+# Spectral analysis of EMG signals for ELEMYO GUI (no Qt dependencies)
+# 2026-10-17 by ELEMYO (https://github.com/ELEMYO/ELEMYO-GUI)
+#
+# Changelog:
+#     2026-10-17 - windowed EMG features: RMS, MAV, WL, ZC, SSC, MNF, MDF
+#     2026-10-17 - incremental spectrogram
+#     2026-10-17 - initial release, real FFT spectrum with windows, Welch averaging, mean and median frequency
+
+# Code is placed under the MIT license
+# Copyright (c) 2020 ELEMYO
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+# ===============================================
+
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+from scipy.signal import get_window
+
+FFT_SIZES = (512, 1024, 2048, 4096) # Available FFT lengths in samples
+FFT_WINDOWS = ('rectangular', 'hann', 'hamming') # Available window functions
+SPECTROGRAM_FLOOR = -100 # Power of not computed spectrogram columns in dB
+FEATURES = ('RMS', 'MAV', 'WL', 'ZC', 'SSC', 'MNF', 'MDF') # Features of Features.process, in order of values
+
+# Window function of given length (periodic, as used for spectral analysis)
+def fftWindow(name, size):
+    return get_window('boxcar' if name == 'rectangular' else name, size)
+
+# Mean frequency of power spectrum (channels, bins) in band low-high Hz
+def meanFrequency(power, freqs, low=0, high=np.inf):
+    band = (freqs >= low) & (freqs <= high)
+    total = power[..., band].sum(axis=-1)
+    return np.divide((power[..., band]*freqs[band]).sum(axis=-1), total, out=np.zeros(total.shape), where=total > 0)
+
+# Median frequency of power spectrum (channels, bins) in band low-high Hz: frequency dividing band power in halves
+def medianFrequency(power, freqs, low=0, high=np.inf):
+    band = (freqs >= low) & (freqs <= high)
+    if not np.any(band):
+        return np.zeros(power.shape[:-1])
+    cumulative = np.cumsum(power[..., band], axis=-1)
+    index = np.argmax(cumulative >= 0.5*cumulative[..., -1:], axis=-1)
+    return np.where(cumulative[..., -1] > 0, freqs[band][index], 0)
+
+# Amplitude spectrum of multi-channel signal: real FFT of windowed data, optionally averaged over
+# overlapping segments (Welch method) and smoothed between updates. Window and frequencies are cached.
+class Spectrum:
+    # Custom constructor
+    def __init__(self, size=2048, window='hann', segments=1, overlap=0.5, smoothing=0.5):
+        self.settings = None
+        self.smoothing = smoothing # Weight of previous spectrum in displayed one
+        self.configure(size, window, segments, 1, overlap)
+
+    # Change spectrum settings, cached arrays and smoothed spectrum are dropped only if settings were changed
+    def configure(self, size, window, segments, fs, overlap=0.5):
+        settings = (size, window, segments, fs, overlap)
+        if settings == self.settings:
+            return
+        self.settings = settings
+        self.size = size # FFT length in samples
+        self.segments = segments # Number of averaged segments
+        self.step = max(1, int(size*(1 - overlap))) # Shift between segments in samples
+        self.window = fftWindow(window, size)
+        self.window /= self.window.sum() # Amplitude normalization is included in window
+        self.freqs = rfftfreq(size, 1/fs) # Frequency of each bin in Hz
+        self.reset()
+
+    def reset(self):
+        self.power = None # Smoothed power spectrum (channels, bins)
+
+    # Samples number needed for one update
+    def length(self):
+        return self.size + (self.segments - 1)*self.step
+
+    # Update spectrum with last samples of block (channels, n), returns amplitude spectrum (channels, bins).
+    # Shorter blocks give less Welch segments; channels are transformed in one call.
+    def process(self, block):
+        block = np.asarray(block, float)
+        n = min(block.shape[-1], self.length())
+        if n < self.size:
+            block = np.concatenate((np.zeros(block.shape[:-1] + (self.size - n,)), block[..., -n:]), axis=-1)
+            n = self.size
+        data = block[..., -n:]
+        count = (n - self.size)//self.step + 1
+        if count > 1:
+            data = np.lib.stride_tricks.as_strided(data, data.shape[:-1] + (count, self.size), data.strides[:-1] + (data.strides[-1]*self.step, data.strides[-1]))
+        spectrum = rfft(data*self.window, axis=-1)
+        power = spectrum.real**2 + spectrum.imag**2
+        if count > 1:
+            power = power.mean(axis=-2)
+        if self.power is None or self.power.shape != power.shape:
+            self.power = power
+        else:
+            self.power = (1 - self.smoothing)*power + self.smoothing*self.power
+        return np.sqrt(self.power)
+
+    # Mean and median frequency of the current spectrum in band low-high Hz for each channel
+    def frequencies(self, low=0, high=np.inf):
+        if self.power is None:
+            return np.zeros(0), np.zeros(0)
+        return meanFrequency(self.power, self.freqs, low, high), medianFrequency(self.power, self.freqs, low, high)
+
+# Spectrogram of one channel in preallocated ring of columns (columns, bins), power in dB.
+# Columns are computed incrementally: only columns ending at samples arrived since previous update.
+class Spectrogram:
+    # Custom constructor
+    def __init__(self, size=256, hop=64, columns=256, window='hann'):
+        self.settings = None
+        self.configure(size, hop, columns, window, 1)
+
+    # Change spectrogram settings, returns True if image was recreated
+    def configure(self, size, hop, columns, window, fs):
+        settings = (size, hop, columns, window, fs)
+        if settings == self.settings:
+            return False
+        self.settings = settings
+        self.size = size # FFT length in samples
+        self.hop = hop # Samples between columns
+        self.columns = columns # Number of columns in ring
+        self.fs = fs
+        self.window = fftWindow(window, size)
+        self.window /= self.window.sum()
+        self.freqs = rfftfreq(size, 1/fs) # Frequency of each bin in Hz
+        self.reset()
+        return True
+
+    def reset(self):
+        self.image = np.full((self.columns, len(self.freqs)), SPECTROGRAM_FLOOR, np.float32) # Ring of columns
+        self.column = 0 # Number of computed columns, next column is written to column % columns
+        self.next = None # Number of sample ending next column
+        self.peak = SPECTROGRAM_FLOOR # Slowly decaying maximum power in dB, for image levels
+
+    # Compute new columns for channel of buffer (RingBuffer with latest samples), count - number of
+    # samples received so far (sample clock, not changed by data refiltering). Returns number of new columns.
+    def process(self, buffer, count, channel):
+        if self.next is None:
+            self.next = count
+        # Columns older than ring or buffer content are skipped
+        first = max(count - (self.columns - 1)*self.hop, count - buffer.capacity + self.size)
+        if self.next < first:
+            skipped = -(-(first - self.next)//self.hop)
+            self.next += skipped*self.hop
+            self.column += skipped
+        if self.next > count:
+            return 0
+
+        m = (count - self.next)//self.hop + 1
+        samples = np.asarray(buffer.latest(count - self.next + self.size)[0][channel], float)
+        frames = np.lib.stride_tricks.as_strided(samples, (m, self.size), (samples.strides[0]*self.hop, samples.strides[0]))
+        spectrum = rfft(frames*self.window, axis=-1)
+        power = 10*np.log10(spectrum.real**2 + spectrum.imag**2 + 1e-12)
+
+        self.image[(self.column + np.arange(m)) % self.columns] = power
+        self.column += m
+        self.next += m*self.hop
+        self.peak = max(float(power[:, 2:].max()), self.peak - 0.05*m) # Without DC bins
+        return m
+
+    # Position of the last computed column in ring
+    def position(self):
+        return (self.column - 1) % self.columns
+
+# Time and frequency features of sliding window for all channels, computed every hop samples:
+# root mean square, mean absolute value, waveform length, zero crossings, slope sign changes, mean and
+# median frequency. Sums over window are differences of running sums of per-sample terms, so each hop
+# costs O(channels) plus one FFT of window; blocks of any length are taken, state is kept between them.
+class Features:
+    # Custom constructor, threshold - minimal signal step counted by ZC and SSC (noise rejection)
+    def __init__(self, window=256, hop=64, threshold=0.0, windowFunction='hann'):
+        self.settings = None
+        self.configure(window, hop, 1, threshold, windowFunction)
+
+    # Change settings, returns True if state was dropped
+    def configure(self, window, hop, fs, threshold=0.0, windowFunction='hann', low=0, high=np.inf):
+        settings = (window, hop, fs, threshold, windowFunction)
+        self.low = low # Band of MNF and MDF in Hz
+        self.high = high
+        if settings == self.settings:
+            return False
+        self.settings = settings
+        self.size = window # Window length in samples
+        self.hop = hop # Samples between feature rows
+        self.threshold = threshold
+        self.window = fftWindow(windowFunction, window)
+        self.freqs = rfftfreq(window, 1/fs)
+        self.channels = None
+        self.reset()
+        return True
+
+    def reset(self):
+        self.count = 0 # Number of samples taken
+        self.next = self.size # Sample number ending next window
+        self.tail = None # Last two samples of previous block (channels, 2)
+        self.sums = None # Running sums of per-sample terms for the last window + 1 samples (5, channels, window + 1)
+        self.samples = None # Last window samples (channels, window)
+
+    # Take block (channels, n) of zero-centered signal with sample times (n,), returns times of window
+    # ends (m,) and features (m, channels, len(FEATURES)) of windows ended in block
+    def process(self, block, times):
+        block = np.asarray(block, float)
+        channels, n = block.shape
+        if channels != self.channels:
+            self.channels = channels
+            self.reset()
+        if n == 0:
+            return np.zeros(0), np.zeros((0, channels, len(FEATURES)))
+        if self.tail is None:
+            self.tail = np.repeat(block[:, :1], 2, axis=1)
+            self.sums = np.zeros((5, channels, self.size + 1))
+            self.samples = np.zeros((channels, self.size))
+
+        # Per-sample terms: square, absolute value, step length, zero crossing, slope sign change
+        # (of previous sample, known when the next one has come)
+        x = np.concatenate((self.tail, block), axis=1)
+        step = np.diff(x, axis=1)
+        terms = np.empty((5, channels, n))
+        terms[0] = block**2
+        terms[1] = np.abs(block)
+        terms[2] = np.abs(step[:, 1:])
+        terms[3] = (x[:, 1:-1]*block < 0) & (terms[2] >= self.threshold)
+        terms[4] = step[:, :-1]*-step[:, 1:] > self.threshold
+        self.tail = x[:, -2:]
+
+        sums = np.concatenate((self.sums, self.sums[..., -1:] + np.cumsum(terms, axis=-1)), axis=-1)
+        samples = np.concatenate((self.samples, block), axis=1)
+        ends = np.arange(self.next, self.count + n + 1, self.hop) - self.count # Window ends in samples after block start
+        self.count += n
+        self.sums = sums[..., -(self.size + 1):] - sums[..., -(self.size + 1), None] # Rebased, sums stay as small as window sums
+        self.samples = samples[:, -self.size:]
+        if len(ends) == 0:
+            return np.zeros(0), np.zeros((0, channels, len(FEATURES)))
+        self.next += len(ends)*self.hop
+
+        window = sums[..., ends + self.size] - sums[..., ends] # (5, channels, m)
+        values = np.empty((len(ends), channels, len(FEATURES)))
+        values[..., 0] = np.sqrt(np.maximum(window[0], 0)/self.size).T
+        values[..., 1] = window[1].T/self.size
+        values[..., 2] = window[2].T
+        values[..., 3] = np.round(window[3]).T
+        values[..., 4] = np.round(window[4]).T
+
+        # Power spectrum of each window ending in block, all channels and windows in one FFT
+        frames = samples[:, ends[:, None] + np.arange(self.size)] # (channels, m, window)
+        spectrum = rfft((frames - frames.mean(axis=-1, keepdims=True))*self.window, axis=-1)
+        power = spectrum.real**2 + spectrum.imag**2
+        values[..., 5] = meanFrequency(power, self.freqs, self.low, self.high).T
+        values[..., 6] = medianFrequency(power, self.freqs, self.low, self.high).T
+        return times[ends - 1], values
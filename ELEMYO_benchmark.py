@@ -0,0 +1,274 @@
+# Performance benchmarks for ELEMYO GUI signal processing
+# 2026-10-17 by ELEMYO (https://github.com/ELEMYO/ELEMYO-GUI)
+#
+# Changelog:
+#     2026-10-17 - display pipeline timed with EMGPipeline, as in GUI, playback and converter
+#     2026-10-17 - end-to-end pipeline benchmark with JSON results
+#     2026-10-17 - initial release, serial frame decoder benchmark
+#
+# Usage:
+#     python ELEMYO_benchmark.py [--frames 200000] [--chunk 4096]
+#     python ELEMYO_benchmark.py --channels 1,6 --rates 1572,10000 [--recording file.bin] --output new.json --compare old.json
+#
+# Pipeline benchmark processes stream by ticks of GUI update period, as ELEMYO_GUI.updateListening:
+# decode -> buffer -> EMGPipeline (50 Hz notch, band-pass, envelope) -> FFT -> plot data (min/max decimation).
+# Reported: samples/s of processing, tick latency percentiles, mean time of each stage, peak memory.
+
+# Code is placed under the MIT license
+# Copyright (c) 2020 ELEMYO
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+# ===============================================
+
+import json
+import platform
+import argparse
+import tracemalloc
+import time
+from datetime import datetime
+import numpy as np
+import scipy
+from ELEMYO_core import FrameDecoder, RingBuffer, EMGPipeline, MinMaxDecimator, FRAME_DTYPE, FRAME_END, SENSORS_MAX
+from ELEMYO_analysis import Spectrum
+from ELEMYO_recording import openRecording
+
+STAGES = ('decode', 'buffer', 'pipeline', 'fft', 'plot') # Pipeline stages in processing order
+
+# Serial stream of synthetic frames, as sent by Arduino_Firmware.ino
+def syntheticStream(frames, fs=1572, seed=0):
+    rng = np.random.default_rng(seed)
+    buf = np.zeros(frames, FRAME_DTYPE)
+    buf['data'] = rng.integers(0, 1024, (frames, 6))
+    buf['dt'] = int(1e6/fs)
+    buf['end'] = FRAME_END
+    return buf.tobytes()
+
+# Per-byte parser used by GUI.readFromSerial before the vectorized decoder
+class LegacyDecoder:
+    def __init__(self, dataWidth):
+        self.msg_end = bytearray([0])
+        self.Data = np.zeros((6, dataWidth))
+        self.l = 0
+
+    def decode(self, msg):
+        msg_end_n = 0
+        for i in range (len(msg)-1, 1, -1):
+            if msg[i] == 0xFF and msg[i-1] == 0xFF:
+                msg_end_n = i
+                break
+        if msg_end_n != len(msg):
+            msg_begin = self.msg_end
+            self.msg_end = msg[msg_end_n+1:len(msg)]
+            msg = msg_begin + msg[0:msg_end_n]
+        frames = 0
+        if len(msg) >= 2 and (len(msg)+1)%(16) == 0:
+            for i in range(0, len(msg)-1, 16):
+                if ( self.l == len(self.Data[0])):
+                    self.l = 0
+                for j in range(6):
+                    self.Data[j][self.l] =(int(msg[i+j*2] | msg[i+j*2+1] << 8))
+                dt = (int(msg[i+12] | msg[i+13] << 8))/1000000
+                self.l += 1
+                frames += 1
+        return frames
+
+# Vectorized decoder writing blocks into the same circular array
+class BlockDecoder:
+    def __init__(self, dataWidth):
+        self.frameDecoder = FrameDecoder()
+        self.Data = np.zeros((6, dataWidth))
+        self.l = 0
+
+    def decode(self, msg):
+        samples, dt = self.frameDecoder.decode(msg)
+        index = (self.l + np.arange(len(dt))) % len(self.Data[0])
+        self.Data[:, index] = samples.T
+        self.l = (self.l + len(dt)) % len(self.Data[0])
+        return len(dt)
+
+# Feed stream to decoder by serial-sized chunks, returns decoded frames per second
+def benchmarkDecoder(decoder, stream, chunk):
+    frames = 0
+    start = time.perf_counter()
+    for i in range(0, len(stream), chunk):
+        frames += decoder.decode(stream[i: i + chunk])
+    elapsed = time.perf_counter() - start
+    return frames, frames/elapsed
+
+# Serial stream of recording samples, repeated up to frames number. Sampling frequency is taken from recording.
+def recordedStream(fileName, frames):
+    recording = openRecording(fileName)
+    samples, times = recording.read(0, min(recording.length, frames))
+    recording.close()
+    buf = np.zeros(frames, FRAME_DTYPE)
+    index = np.arange(frames) % len(times)
+    buf['data'][:, :len(samples)] = samples.T[index]
+    buf['dt'] = np.clip(np.round(np.diff(times, prepend=times[0] - 1/recording.fs)*1e6), 1, 65535)[index]
+    buf['end'] = FRAME_END
+    return buf.tobytes(), recording.fs
+
+# Display pipeline of ELEMYO_GUI for given number of channels, stages are timed separately
+class Pipeline:
+    # Custom constructor
+    def __init__(self, channels, fs, timeWidth=10, plotWidth=1000):
+        self.channels = channels
+        self.dataWidth = int((timeWidth + 1)*fs)
+        self.frameDecoder = FrameDecoder()
+        self.Data = RingBuffer(channels, self.dataWidth)
+        self.DataFiltered = RingBuffer(channels, self.dataWidth, timed=False)
+        self.DataEnvelope = RingBuffer(channels, self.dataWidth, timed=False)
+        self.pipeline = EMGPipeline()
+        self.pipeline.configure(fs, 50, (10, min(500, 0.45*fs)), 10)
+        self.spectrum = Spectrum()
+        self.spectrum.configure(2048, 'hann', 1, fs)
+        self.rawDecimator = MinMaxDecimator()
+        self.envelopeDecimator = MinMaxDecimator()
+        self.bucket = int(timeWidth*fs/plotWidth)
+        self.time = 0.0
+
+    # Process serial data of one tick, returns time of each stage in s
+    def tick(self, msg):
+        stages = np.zeros(len(STAGES))
+        start = time.perf_counter()
+        samples, dt = self.frameDecoder.decode(msg)
+        stages[0] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        times = self.time + np.cumsum(dt)
+        if len(times) > 0: self.time = times[-1]
+        block = samples.T[:self.channels].astype(float)
+        self.Data.write(block, times)
+        stages[1] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.pipeline.process(block)
+        stages[2] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.DataFiltered.write(self.pipeline.signal())
+        self.DataEnvelope.write(self.pipeline.envelope())
+        stages[1] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.spectrum.process(self.DataFiltered.latest(self.spectrum.length())[0])
+        stages[3] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Time = self.Data.latest(self.dataWidth)[1]
+        index, Data = self.rawDecimator.process(self.DataFiltered, self.dataWidth, self.bucket)
+        TimeData = Time[index]
+        index, DataEnvelope = self.envelopeDecimator.process(self.DataEnvelope, self.dataWidth, self.bucket)
+        TimeEnvelope = Time[index]
+        stages[4] = time.perf_counter() - start
+        return stages
+
+# Run pipeline over stream split into ticks of tick seconds, returns result dict
+def benchmarkPipeline(stream, fs, channels, tick):
+    chunk = int(fs*tick)*FRAME_DTYPE.itemsize
+    ticks = [stream[i: i + chunk] for i in range(0, len(stream), chunk)]
+    samples = len(stream)//FRAME_DTYPE.itemsize
+
+    # Warm-up run fills buffers and caches, memory is measured in separate run (tracemalloc slows allocations)
+    pipeline = Pipeline(channels, fs)
+    for msg in ticks[:10]: pipeline.tick(msg)
+    stages = np.array([pipeline.tick(msg) for msg in ticks])
+    latency = stages.sum(axis=1)
+
+    tracemalloc.start()
+    pipeline = Pipeline(channels, fs)
+    for msg in ticks[:int(2/tick)]: pipeline.tick(msg)
+    memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'channels': channels, 'fs': fs, 'tick': tick, 'samples': samples, 'ticks': len(ticks),
+            'samples_per_s': samples/latency.sum(),
+            'realtime_factor': samples/fs/latency.sum(),
+            'latency_ms': {'p50': float(np.percentile(latency, 50))*1e3, 'p95': float(np.percentile(latency, 95))*1e3,
+                           'p99': float(np.percentile(latency, 99))*1e3, 'max': float(latency.max())*1e3},
+            'stages_us': {STAGES[k]: float(stages[:, k].mean())*1e6 for k in range(len(STAGES))},
+            'peak_memory_mb': memory/2**20}
+
+# Print table of pipeline results, with ratio to baseline results of the same configuration
+def printResults(results, baseline=None):
+    reference = {(r['channels'], r['fs']): r for r in baseline['pipeline']} if baseline is not None else {}
+    print("%8s %8s %12s %8s %8s %8s %8s %9s  %s" % ('channels', 'fs', 'samples/s', 'p50 ms', 'p95 ms', 'p99 ms', 'max ms', 'memory MB',
+                                                     ' '.join('%8s' % stage for stage in STAGES) + ' (us)'))
+    for r in results:
+        line = "%8d %8.0f %12.0f %8.2f %8.2f %8.2f %8.2f %9.1f  %s" % (r['channels'], r['fs'], r['samples_per_s'], r['latency_ms']['p50'],
+                                                                      r['latency_ms']['p95'], r['latency_ms']['p99'], r['latency_ms']['max'],
+                                                                      r['peak_memory_mb'], ' '.join('%8.1f' % r['stages_us'][stage] for stage in STAGES))
+        old = reference.get((r['channels'], r['fs']))
+        if old is not None:
+            line += "   x%.2f throughput, x%.2f p95" % (r['samples_per_s']/old['samples_per_s'], r['latency_ms']['p95']/old['latency_ms']['p95'])
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='ELEMYO GUI performance benchmarks')
+    parser.add_argument('--frames', type=int, default=200000, help='number of serial frames in decoder test stream')
+    parser.add_argument('--chunk', type=int, default=4096, help='bytes returned by one serial read')
+    parser.add_argument('--channels', default='1,2,4,6', help='comma-separated channels numbers of pipeline benchmark')
+    parser.add_argument('--rates', default='1572,5000,10000', help='comma-separated sampling frequencies in Hz of synthetic stream')
+    parser.add_argument('--duration', type=float, default=30, help='stream duration in s for pipeline benchmark')
+    parser.add_argument('--tick', type=float, default=0.07, help='GUI update period in s')
+    parser.add_argument('--recording', default='', help='recording (*.bin) used as stream instead of synthetic data')
+    parser.add_argument('--output', default='', help='JSON file for results')
+    parser.add_argument('--compare', default='', help='JSON file with results of previous run')
+    args = parser.parse_args()
+
+    stream = syntheticStream(args.frames)
+    dataWidth = int(11*1572)
+
+    print("Serial frame decoder, %d frames, %d bytes per read" % (args.frames, args.chunk))
+    frames, legacy = benchmarkDecoder(LegacyDecoder(dataWidth), stream, args.chunk)
+    print("    per-byte loop: %10.0f frames/s (%d decoded)" % (legacy, frames))
+    frames, block = benchmarkDecoder(BlockDecoder(dataWidth), stream, args.chunk)
+    print("    vectorized:    %10.0f frames/s (%d decoded)" % (block, frames))
+    print("    speedup:       %10.1f x" % (block/legacy))
+
+    results = []
+    if args.recording != '':
+        rates = [openRecording(args.recording).fs]
+    else:
+        rates = [float(r) for r in args.rates.split(',')]
+    for fs in rates:
+        if args.recording != '':
+            stream, fs = recordedStream(args.recording, int(args.duration*fs))
+        else:
+            stream = syntheticStream(int(args.duration*fs), fs)
+        for channels in [int(c) for c in args.channels.split(',')]:
+            results.append(benchmarkPipeline(stream, fs, min(channels, SENSORS_MAX), args.tick))
+
+    print("\nPipeline, %s stream of %.0f s, tick %.0f ms" % (args.recording if args.recording != '' else 'synthetic', args.duration, args.tick*1e3))
+    baseline = None
+    if args.compare != '':
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    printResults(results, baseline)
+
+    if args.output != '':
+        report = {'date': datetime.now().isoformat(timespec='seconds'), 'platform': platform.platform(), 'python': platform.python_version(),
+                  'numpy': np.__version__, 'scipy': scipy.__version__, 'arguments': vars(args),
+                  'decoder': {'frames': args.frames, 'chunk': args.chunk, 'legacy_frames_per_s': legacy, 'vectorized_frames_per_s': block},
+                  'pipeline': results}
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print("results saved to " + args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,931 @@
+# Signal acquisition and processing core for ELEMYO GUI (no Qt dependencies)
+# 2026-10-17 by ELEMYO (https://github.com/ELEMYO/ELEMYO-GUI)
+#
+# Changelog:
+#     2026-10-17 - gain option parsing of command line tools
+#     2026-10-17 - block processing pipeline of stages: filters, offset, scaling, envelope and custom stages
+#     2026-10-17 - listeners of acquired blocks (stream server)
+#     2026-10-17 - several devices on separate ports aligned on host clock
+#     2026-10-17 - adaptive frame pacing of display updates
+#     2026-10-17 - frame resynchronization after damaged data, sample loss events and counters
+#     2026-10-17 - display stages profiler, serial input backlog
+#     2026-10-17 - frame alignment fix for data ending with 0xFF byte of the next frame
+#     2026-10-17 - ports without modem control lines, extra ports from ELEMYO_PORTS environment variable
+#     2026-10-17 - min/max decimation of plot data
+#     2026-10-17 - device commands helpers
+#     2026-10-17 - ring buffer used for display data, latest samples view
+#     2026-10-17 - vectorized signal envelope
+#     2026-10-17 - filter design cache
+#     2026-10-17 - streaming IIR filter
+#     2026-10-17 - acquisition thread with ring buffer, serial monitor moved from ELEMYO_GUI.py
+#     2026-10-17 - initial release, vectorized serial frame decoder
+
+# Code is placed under the MIT license
+# Copyright (c) 2020 ELEMYO
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+# ===============================================
+
+import os
+import importlib
+import argparse
+import threading
+import queue
+import collections
+import time
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfiltfilt, sosfilt_zi, lfilter
+import serial
+import serial.tools.list_ports
+from serial import SerialException
+
+SENSORS_MAX = 6 # Maximum number of sensors in one serial frame
+FRAME_SIZE = 16 # Serial frame length in bytes
+FRAME_END = 0xFFFF # Serial frame terminator (two 0xFF bytes)
+GAINS = (1, 2, 4, 5, 8, 10, 16, 32) # Sensor gains, index - gain number in device command
+MICROVOLTS_SIGNAL = 5000 # μV of full ADC range for gain 1, signal in μV is ADC value*MICROVOLTS_SIGNAL/(2^bits - 1)/gain
+MICROVOLTS_ENVELOPE = 4931 # μV of full ADC range for gain 1 used for envelope in μV
+LOSS_LINK = 1 # Loss event kind: damaged serial data
+LOSS_GAP = 2 # Loss event kind: gap of device frame time
+LOSS_OVERRUN = 3 # Loss event kind: samples overwritten in acquisition buffer (display or recording is too slow)
+LOSS_NAMES = {LOSS_LINK: 'serial data damaged', LOSS_GAP: 'device time gap', LOSS_OVERRUN: 'display is too slow'}
+
+# Gain indices of comma-separated gains, e.g. '1,8,8' (type of command line gain options)
+def gainIndices(text):
+    try:
+        return [GAINS.index(int(g)) for g in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid gain '" + text + "', available gains: " + ', '.join(map(str, GAINS)))
+
+# Serial frame layout: 6 sensor samples, time from previous frame in us, terminator
+FRAME_DTYPE = np.dtype([('data', '<u2', (SENSORS_MAX,)), ('dt', '<u2'), ('end', '<u2')])
+
+# Serial frame decoder: state machine synchronized on frame terminators. Frames with terminator at
+# the right place are kept, after damaged frame the bytes are skipped up to the next terminator.
+# Lost samples are estimated from skipped bytes and from gaps of device frame time.
+class FrameDecoder:
+    # Custom constructor, gapFactor - frame time relative to nominal one counted as gap
+    def __init__(self, gapFactor=1.5):
+        self.gapFactor = gapFactor
+        self.reset()
+
+    # Drop incomplete frame and counters
+    def reset(self):
+        self.restart()
+        self.frames = 0 # Number of decoded frames
+        self.dropped = 0 # Number of damaged frames (terminator is not at the right place)
+        self.skipped = 0 # Number of bytes skipped while synchronizing
+        self.gaps = 0 # Number of device frame time gaps
+        self.repaired = 0 # Number of frames with damaged time replaced by nominal one
+        self.lost = 0 # Estimated number of lost samples
+
+    # Drop incomplete frame, counters are kept. Used when device stream is restarted
+    def restart(self):
+        self.tail = b'' # Bytes of incomplete frame left from previous read
+        self.synced = False # Start of the next frame is known
+        self.started = False # Stream was synchronized at least once (bytes before are not counted as loss)
+        self.skipping = 0 # Bytes skipped since synchronization was lost
+        self.pending = 0 # Lost samples not reported yet (no frames after loss)
+        self.period = 0.0 # Nominal time between frames in s (mean of last frames without gaps)
+        self.events = [] # Losses of last decoded block: (index of the first frame after loss, lost samples, kind)
+
+    # Decode serial data. Returns samples array (frames, 6) and time between samples in s (frames).
+    # Time of samples lost in damaged data is added to the time of the next frame.
+    def decode(self, msg):
+        msg = self.tail + bytes(msg)
+        pos = 0
+        blocks = [] # Valid frames runs
+        damaged = [(0, self.pending)] if self.pending > 0 else [] # (frame index, lost samples) of damaged data before frames
+        self.pending = 0
+        decoded = 0
+        while True:
+            if not self.synced:
+                end = msg.find(b'\xff\xff', pos)
+                if end < 0:
+                    keep = 1 if msg.endswith(b'\xff') else 0 # First byte of terminator
+                    self.skipping += len(msg) - keep - pos
+                    pos = len(msg) - keep
+                    break
+                start = end + 2 - FRAME_SIZE # Start of frame ended by found terminator
+                if start >= pos and (not self.started or (self.skipping + start - pos) % FRAME_SIZE == 0):
+                    # Frame is complete: the first frame in stream or damage did not change data length
+                    self.skipping += start - pos
+                    pos = start
+                else:
+                    self.skipping += end + 2 - pos
+                    pos = end + 2
+                self.synced = True
+                if self.started:
+                    damaged.append((decoded, max(1, round(self.skipping/FRAME_SIZE))))
+                    self.skipped += self.skipping
+                self.started = True
+                self.skipping = 0
+
+            count = (len(msg) - pos)//FRAME_SIZE
+            if count == 0:
+                break
+            frames = np.frombuffer(msg, FRAME_DTYPE, count, pos)
+            valid = frames['end'] == FRAME_END
+            good = count if valid.all() else int(np.argmin(valid))
+            if good > 0:
+                blocks.append(frames[:good])
+                decoded += good
+                pos += good*FRAME_SIZE
+            if good == count:
+                break
+            # Damaged frame: terminator is searched from its first byte
+            self.synced = False
+            self.dropped += 1
+        self.tail = msg[pos:]
+
+        self.events = []
+        if decoded == 0:
+            self.pending += sum(lost for k, lost in damaged)
+            return np.zeros((0, SENSORS_MAX), np.uint16), np.zeros(0)
+        frames = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+        dt = frames['dt']*1e-6
+        if self.period == 0:
+            self.period = float(np.median(dt))
+
+        # Device time gaps: frames were not sent by device
+        gap = dt > self.gapFactor*self.period
+        if not gap.any():
+            self.period = float(dt.mean())
+        elif np.count_nonzero(gap) > len(dt)//2:
+            self.period = float(np.median(dt)) # Sampling frequency was changed
+        else:
+            for k in np.flatnonzero(gap):
+                ratio = dt[k]/self.period
+                if abs(ratio - round(ratio)) > 0.25:
+                    # Gap is not a whole number of frames: time field is damaged
+                    dt[k] = self.period
+                    self.repaired += 1
+                    continue
+                self.events.append((int(k), int(round(ratio)) - 1, LOSS_GAP))
+                self.gaps += 1
+            self.period = float(dt[~gap].mean())
+
+        # Damaged data: time of lost frames is added to the next frame
+        for k, lost in damaged:
+            if k < len(dt):
+                dt[k] += lost*self.period
+                self.events.append((k, lost, LOSS_LINK))
+            else:
+                self.pending += lost
+        if len(self.events) > 0:
+            self.events.sort()
+            self.lost += sum(event[1] for event in self.events)
+        self.frames += decoded
+
+        return frames['data'], dt
+
+# Preallocated multi-channel ring buffer with optional timestamp column.
+# Lock-free for one writer thread and one reader thread: samples are copied first
+# and published by the following increment of count.
+class RingBuffer:
+    # Custom constructor
+    def __init__(self, channels, capacity, dtype=np.float64, fill=0, timed=True):
+        self.channels = channels
+        self.capacity = capacity
+        self.data = np.full((channels, capacity), fill, dtype) # Sample data, first index - channel, second index - sample
+        self.time = np.zeros(capacity) if timed else None # Sample time in s
+        self.count = 0 # Number of samples written since creation
+
+    # Append samples block (channels, n) with time array (n)
+    def write(self, samples, times=None):
+        n = samples.shape[1]
+        if n > self.capacity:
+            samples = samples[:, -self.capacity:]
+            if times is not None: times = times[-self.capacity:]
+            self.count += n - self.capacity
+            n = self.capacity
+
+        start = self.count % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[:, start: start + first] = samples[:, :first]
+        self.data[:, :n - first] = samples[:, first:]
+        if self.time is not None:
+            self.time[start: start + first] = times[:first]
+            self.time[:n - first] = times[first:]
+        self.count += n
+
+    # Last n samples (channels, n) and times (n) in order of writing. Returns views of
+    # buffer memory if samples are stored contiguously, otherwise one copy.
+    # Buffer is initially filled, so n up to capacity samples are always available.
+    def latest(self, n):
+        end = self.count % self.capacity
+        if end == 0: end = self.capacity
+        if n <= end:
+            samples = self.data[:, end - n: end]
+            times = self.time[end - n: end] if self.time is not None else None
+        else:
+            samples = np.concatenate((self.data[:, self.capacity - n + end:], self.data[:, :end]), axis=1)
+            times = np.concatenate((self.time[self.capacity - n + end:], self.time[:end])) if self.time is not None else None
+        return samples, times
+
+    # Copy samples written after cursor. Returns samples (channels, n), times (n),
+    # new cursor and number of samples overwritten before they were read
+    def read(self, cursor):
+        count = self.count
+        lost = max(0, count - self.capacity - cursor)
+        cursor += lost
+
+        index = np.arange(cursor, count) % self.capacity
+        samples = self.data[:, index]
+        times = self.time[index]
+
+        # Samples overwritten by the writer while they were copied
+        overrun = max(0, self.count - self.capacity - cursor)
+        if overrun > 0:
+            samples = samples[:, overrun:]
+            times = times[overrun:]
+            lost += overrun
+
+        return samples, times, count, lost
+
+# Min/max decimation of the latest ring buffer samples for plotting: every bucket of samples
+# (one pixel column) is replaced by its minimum and maximum, so spikes stay visible. Buckets are
+# aligned to absolute sample numbers and cached, only buckets of new samples are computed.
+class MinMaxDecimator:
+    # Custom constructor
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buffer = None # Ring buffer of cached buckets
+        self.bucket = 0 # Samples number in bucket
+        self.first = 0 # Number of first cached bucket
+        self.mins = None # Cached minimums (channels, buckets)
+        self.maxs = None # Cached maximums (channels, buckets)
+
+    # Decimate last n samples of buffer. Returns positions of points in the window of n samples
+    # and their values (channels, points). Incomplete buckets at window edges are kept as samples.
+    def process(self, buffer, n, bucket):
+        samples = buffer.latest(n)[0]
+        if bucket <= 1:
+            return np.arange(n), samples
+        if buffer is not self.buffer or bucket != self.bucket:
+            self.reset()
+            self.buffer = buffer
+            self.bucket = bucket
+
+        begin = buffer.count - n # Absolute number of first sample in window
+        first = -(-begin//bucket) # First complete bucket
+        last = buffer.count//bucket # Bucket after the last complete one
+        cached = self.first + (self.mins.shape[1] if self.mins is not None else 0)
+
+        if self.mins is None or first < self.first or cached <= first:
+            self.first, cached = first, first
+            self.mins = np.zeros((buffer.channels, 0))
+            self.maxs = np.zeros((buffer.channels, 0))
+        if last > cached:
+            block = samples[:, cached*bucket - begin: last*bucket - begin].reshape(buffer.channels, last - cached, bucket)
+            self.mins = np.concatenate((self.mins[:, first - self.first:], block.min(axis=2)), axis=1)
+            self.maxs = np.concatenate((self.maxs[:, first - self.first:], block.max(axis=2)), axis=1)
+        else:
+            self.mins = self.mins[:, first - self.first: last - self.first]
+            self.maxs = self.maxs[:, first - self.first: last - self.first]
+        self.first = first
+
+        head = first*bucket - begin
+        tail = last*bucket - begin
+        starts = np.arange(head, tail, bucket)
+        index = np.concatenate((np.arange(head), np.repeat(starts, 2), np.arange(tail, n)))
+        values = np.concatenate((samples[:, :head], np.stack((self.mins, self.maxs), axis=2).reshape(buffer.channels, -1), samples[:, tail:]), axis=1)
+        return index, values
+
+# Timing of display update stages: rolling trace of the last ticks, one row per tick with time of each
+# stage and counters (samples, bytes waiting, ...). Calls of disabled profiler return immediately.
+class Profiler:
+    # Custom constructor, stages and counters - column names, length - number of ticks kept
+    def __init__(self, stages, counters=(), length=4096):
+        self.stages = tuple(stages)
+        self.counters = tuple(counters)
+        self.columns = ('time', 'interval', 'total') + self.stages + self.counters
+        self.column = {name: k for k, name in enumerate(self.columns)}
+        self.trace = np.zeros((length, len(self.columns)))
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.count = 0 # Number of recorded ticks
+        self.row = np.zeros(len(self.columns)) # Current tick
+        self.tickStart = None # Start time of current tick
+        self.markTime = 0.0 # Time of last stage mark
+
+    # Start of tick
+    def begin(self):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.row[:] = 0
+        self.row[0] = now
+        self.row[1] = now - self.tickStart if self.tickStart is not None else np.nan
+        self.tickStart = now
+        self.markTime = now
+
+    # Time since previous mark (or tick start) is added to stage
+    def mark(self, stage):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.row[self.column[stage]] += now - self.markTime
+        self.markTime = now
+
+    # Value is added to counter of current tick
+    def value(self, counter, value):
+        if not self.enabled: return
+        self.row[self.column[counter]] += value
+
+    # End of tick, row is stored in trace
+    def end(self):
+        if not self.enabled or self.tickStart is None: return
+        self.row[2] = time.perf_counter() - self.tickStart
+        self.trace[self.count % len(self.trace)] = self.row
+        self.count += 1
+
+    # Rows of recorded ticks in time order
+    def latest(self):
+        if self.count <= len(self.trace):
+            return self.trace[:self.count]
+        return np.roll(self.trace, -(self.count % len(self.trace)), axis=0)
+
+    # Percentiles of column over last ticks
+    def percentiles(self, column, q=(50, 95), ticks=100):
+        values = self.latest()[-ticks:, self.column[column]]
+        values = values[~np.isnan(values)]
+        return np.percentile(values, q) if len(values) > 0 else np.zeros(len(q))
+
+    # Counts of column values below each of edges and above the last edge over last ticks
+    def histogram(self, column, edges, ticks=100):
+        values = self.latest()[-ticks:, self.column[column]]
+        return np.bincount(np.searchsorted(edges, values[~np.isnan(values)], side='right'), minlength=len(edges) + 1)
+
+    # Save trace to CSV file: time from first tick in s, stage times in ms, counters
+    def save(self, fileName):
+        rows = self.latest().copy()
+        rows[:, 0] -= rows[0, 0] if len(rows) > 0 else 0
+        rows[:, 1: 3 + len(self.stages)] *= 1e3
+        header = ','.join(['time'] + [name + ' (ms)' for name in self.columns[1: 3 + len(self.stages)]] + list(self.counters))
+        np.savetxt(fileName, rows, fmt='%.4f', delimiter=',', header=header, comments='')
+
+# Frame pacing of display updates. Frames are requested at monotonic deadlines of target frame rate,
+# only one frame can wait for processing: deadlines passed while frame is pending are coalesced.
+# When frame cost (from request to rendered frame) exceeds target interval, interval follows the cost.
+class FrameScheduler:
+    # Custom constructor, fps - target frame rate, headroom - interval relative to frame cost left for user input
+    def __init__(self, fps=25, headroom=1.25):
+        self.fps = fps
+        self.headroom = headroom
+        self.cost = 0.0 # Smoothed frame cost in s
+        self.pending = False # Frame is requested and not rendered yet
+        self.ready = threading.Event() # Set when pending frame is rendered
+        self.requestTime = 0.0 # Time of pending frame request
+        self.frames = 0 # Number of rendered frames
+        self.coalesced = 0 # Number of deadlines passed while frame was pending
+        self.start()
+
+    # Restart deadlines from now
+    def start(self):
+        self.deadline = time.monotonic()
+        self.pending = False
+        self.ready.set()
+
+    # Time between frames in s
+    def interval(self):
+        return max(1/self.fps, self.cost*self.headroom)
+
+    # Called by timer thread: returns True when frame is requested, otherwise time to wait for deadline in s
+    # or None when previous frame is pending (wait for ready event)
+    def poll(self):
+        now = time.monotonic()
+        if now < self.deadline:
+            return False, self.deadline - now
+        if self.pending:
+            return False, None
+        interval = self.interval()
+        self.coalesced += int((now - self.deadline)/interval)
+        self.pending = True
+        self.ready.clear()
+        self.requestTime = now
+        # The next deadline keeps frame phase, but is never in the past, so missed frames are not repeated
+        self.deadline = max(self.deadline + interval, now)
+        return True, 0
+
+    # Called by GUI thread when requested frame is processed and rendered
+    def done(self):
+        if not self.pending:
+            return
+        cost = time.monotonic() - self.requestTime
+        self.cost = cost if self.frames == 0 else 0.9*self.cost + 0.1*cost
+        self.frames += 1
+        self.pending = False
+        self.ready.set()
+
+# Butterworth filter design as second-order sections, btype - 'bandpass' or 'bandstop'
+def butter_sos(btype, lowcut, highcut, fs, order=4):
+    nyq = 0.5*fs
+    return butter(order, [lowcut/nyq, highcut/nyq], btype=btype, output='sos')
+
+# Filter design cache of band-pass filters and bandstop cascades of mains harmonics
+class FilterBank:
+    # Custom constructor
+    def __init__(self):
+        self.cache = {} # Designed sections, key - (type, band, order, fs)
+        self.hits = 0 # Designs taken from cache
+        self.misses = 0 # Designs computed by scipy
+
+    # Butterworth filter sections for one band
+    def design(self, btype, lowcut, highcut, fs, order=4):
+        key = (btype, (lowcut, highcut), order, fs)
+        if key in self.cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.cache[key] = butter_sos(btype, lowcut, highcut, fs, order)
+        return self.cache[key]
+
+    # Bandstop cascade for 50/60 Hz mains frequency and its harmonics
+    def notch(self, mains, fs, order=4):
+        key = ('notch', mains, order, fs)
+        if key in self.cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            sos = [butter_sos('bandstop', mains - 5 + j*mains, mains + 5 + j*mains, fs, order) for j in range(int(fs//(2*mains)) - 3)]
+            self.cache[key] = np.concatenate(sos) if len(sos) > 0 else np.zeros((0, 6))
+        return self.cache[key]
+
+# Stage of processing pipeline: takes block (channels, n) and returns block (channels, n), keeps its
+# state between blocks. Disabled stage passes blocks unchanged.
+class Stage:
+    enabled = True
+
+    # Drop state, next block starts new data
+    def reset(self):
+        pass
+
+    def process(self, block):
+        return block
+
+# Multi-channel IIR filter keeping its state between data blocks
+class StreamingFilter(Stage):
+    # Custom constructor, zeroPhase - forward-backward filtering of each block without state (whole recording as one block)
+    def __init__(self, sos=None, zeroPhase=False):
+        self.zeroPhase = zeroPhase
+        self.setSOS(sos)
+
+    # Set filter cascade (None - pass data unchanged) and drop filter state
+    def setSOS(self, sos):
+        self.sos = sos
+        self.zi = None
+
+    def reset(self):
+        self.zi = None
+
+    # Filter block (channels, n), continues from the end of the previous block
+    def process(self, block):
+        if self.sos is None:
+            return np.array(block, float)
+        if block.shape[-1] == 0:
+            return np.zeros(block.shape)
+        if self.zeroPhase:
+            return sosfiltfilt(self.sos, np.asarray(block, float), axis=-1)
+        if self.zi is None or self.zi.shape[1] != len(block):
+            # Steady state for the first sample, so filter starts without transient
+            self.zi = sosfilt_zi(self.sos)[:, None, :]*np.asarray(block, float)[None, :, 0, None]
+        y, self.zi = sosfilt(self.sos, block, axis=-1, zi=self.zi)
+        return y
+
+# Signal envelope: rectification and triple exponential moving average of data blocks
+class Envelope(Stage):
+    # Custom constructor
+    def __init__(self, channels=SENSORS_MAX, alpha=0.95):
+        self.channels = channels
+        self.alpha = alpha # Smoothing coefficient
+        self.reset()
+
+    def reset(self):
+        self.MA = np.zeros((3, self.channels)) # Last output of each averaging stage
+
+    # Envelope of block (channels, n)
+    def process(self, block):
+        y = np.abs(block)
+        if y.shape[-1] == 0:
+            return y
+        if len(y) != self.channels:
+            self.channels = len(y)
+            self.reset()
+        for k in range(3):
+            y, _ = lfilter([1 - self.alpha], [1, -self.alpha], y, axis=-1, zi=self.alpha*self.MA[k][:, None])
+            self.MA[k] = y[:, -1]
+        return y*2
+
+# Constant subtracted from all samples (ADC midpoint)
+class Offset(Stage):
+    # Custom constructor
+    def __init__(self, value=0.0):
+        self.value = value
+
+    def process(self, block):
+        return block - self.value
+
+# Samples multiplied by coefficient of channel (e.g. ADC units to μV), channels without coefficient are not changed
+class Scale(Stage):
+    # Custom constructor, coefficients - sequence with coefficient of each channel
+    def __init__(self, coefficients=()):
+        self.coefficients = np.asarray(coefficients, float)
+
+    def process(self, block):
+        coefficients = np.ones(len(block))
+        n = min(len(block), len(self.coefficients))
+        coefficients[:n] = self.coefficients[:n]
+        return block*coefficients[:, None]
+
+# Ordered named stages run once per block for all channels. Input and output of each stage of the last
+# block are kept, so several signals of the chain can be taken (e.g. filtered data and its envelope).
+class Pipeline:
+    # Custom constructor, stages - sequence of (name, stage)
+    def __init__(self, stages=()):
+        self.names = [] # Stage names in processing order
+        self.stages = {} # Stage of name
+        self.inputs = {} # Block given to stage in the last process call
+        self.outputs = {} # Block returned by stage in the last process call (input block for disabled stage)
+        for name, stage in stages: self.add(name, stage)
+
+    # Insert stage before or after stage with given name (default - at the end)
+    def add(self, name, stage, before=None, after=None):
+        if name in self.stages:
+            raise ValueError('pipeline already has stage ' + name)
+        if before is not None:
+            index = self.names.index(before)
+        elif after is not None:
+            index = self.names.index(after) + 1
+        else:
+            index = len(self.names)
+        self.names.insert(index, name)
+        self.stages[name] = stage
+
+    def remove(self, name):
+        self.names.remove(name)
+        del self.stages[name]
+        self.inputs.pop(name, None)
+        self.outputs.pop(name, None)
+
+    def __getitem__(self, name):
+        return self.stages[name]
+
+    def __contains__(self, name):
+        return name in self.stages
+
+    def reset(self):
+        for name in self.names: self.stages[name].reset()
+
+    # Run stages on block (channels, n), returns output of the last stage
+    def process(self, block):
+        for name in self.names:
+            stage = self.stages[name]
+            self.inputs[name] = block
+            if stage.enabled:
+                block = stage.process(block)
+            self.outputs[name] = block
+        return block
+
+# Stages given as 'module:Class' (comma-separated), e.g. ELEMYO_PIPELINE environment variable or
+# convert --stage option. Class is created without arguments, stage name is class name in lower case.
+def loadStages(spec):
+    stages = []
+    for item in spec.split(','):
+        if item.strip() == '': continue
+        module, _, name = item.strip().partition(':')
+        stages.append((name.lower(), getattr(importlib.import_module(module), name)()))
+    return stages
+
+# Processing chain of ELEMYO signals: bandstop (mains harmonics), bandpass, removal of ADC midpoint
+# (when there is no bandpass), scaling to μV, envelope and its calibration in μV. Custom stages added before 'envelope' change
+# both plotted signal and its envelope, stages added after it change envelope only.
+class EMGPipeline(Pipeline):
+    # Custom constructor, stages - custom stages (name, stage) added before envelope
+    def __init__(self, stages=()):
+        Pipeline.__init__(self, [('bandstop', StreamingFilter()), ('bandpass', StreamingFilter()), ('offset', Offset()), 
+                                 ('scale', Scale()), ('envelope', Envelope()), ('calibration', Scale())])
+        for name, stage in stages: self.add(name, stage, before='envelope')
+        self.filterBank = FilterBank() # Cache of filters design
+        self.settings = None # Settings of standard stages
+
+    # Set standard stages, notch - mains frequency (0 - no bandstop filter), bandpass - (low, high) frequencies
+    # or None, gains - gain of each channel, used with microvolts. Returns True if settings were changed.
+    def configure(self, fs, notch=0, bandpass=None, ADCbits=10, gains=(), alpha=0.95, microvolts=False, zeroPhase=False):
+        settings = (fs, notch, tuple(bandpass) if bandpass is not None else None, ADCbits, tuple(gains), alpha, microvolts, zeroPhase)
+        if settings == self.settings:
+            return False
+        self.settings = settings
+        self['bandstop'].enabled = notch > 0
+        self['bandstop'].zeroPhase = zeroPhase
+        self['bandstop'].setSOS(self.filterBank.notch(notch, fs) if notch > 0 else None)
+        if self['bandstop'].sos is not None and len(self['bandstop'].sos) == 0: self['bandstop'].setSOS(None)
+        self['bandpass'].enabled = bandpass is not None
+        self['bandpass'].zeroPhase = zeroPhase
+        self['bandpass'].setSOS(self.filterBank.design('bandpass', bandpass[0], bandpass[1], fs) if bandpass is not None else None)
+        self['offset'].enabled = bandpass is None
+        self['offset'].value = 2**ADCbits*0.5*0.986
+        self['scale'].enabled = microvolts
+        self['scale'].coefficients = MICROVOLTS_SIGNAL/(2**ADCbits - 1)/np.asarray(gains, float) if len(gains) > 0 else np.ones(0)
+        self['envelope'].alpha = alpha
+        self['calibration'].enabled = microvolts
+        self['calibration'].coefficients = np.full(len(gains), MICROVOLTS_ENVELOPE/MICROVOLTS_SIGNAL)
+        self.reset()
+        return True
+
+    # Signal before envelope; data in ADC units keep ADC midpoint, as raw data
+    def signal(self):
+        block = self.inputs['envelope']
+        if self['offset'].enabled and not self['scale'].enabled:
+            block = block + self['offset'].value
+        return block
+
+    # Envelope of the last block (calibrated in μV)
+    def envelope(self):
+        return self.outputs['calibration']
+
+    # Envelope values of channels converted back to ADC units when pipeline output is in μV
+    def envelopeADC(self, values):
+        values = np.asarray(values, float)
+        for name in ('scale', 'calibration'):
+            if self[name].enabled: values = values/self[name].process(np.ones((len(values), 1)))[:, 0]
+        return values
+
+# Serial monitor class
+class SerialMonitor:
+    # Custom constructor
+    def __init__(self):
+        self.running = False
+        self.connect = False
+        self.baudRate = 250000
+        self.timeout = 0.05 # Serial read timeout in s
+        self.playFile = 0   
+        self.updatePorts()
+        self.COM = ''
+        self.backlog = 0 # Bytes waiting in serial input buffer at last read
+        self.ser = serial.Serial()
+        if len(self.ports) > 0:
+            self.COM = self.ports[0]
+        
+    # Serial ports of system and ports listed in ELEMYO_PORTS environment variable (e.g. device emulator)
+    def updatePorts(self):
+        self.ports = [p[0] for p in serial.tools.list_ports.comports(include_links=False) ]
+        self.ports += [p for p in os.environ.get('ELEMYO_PORTS', '').split(os.pathsep) if p != '' and p not in self.ports]
+    
+    def serialConnect(self):
+        self.updatePorts()
+        if not self.connect:
+            if self.COM != '':
+                try:
+                    self.ser = serial.Serial(self.COM, self.baudRate, timeout=self.timeout)
+                    try:
+                        self.ser.setDTR(False)
+                        self.ser.setRTS(False)
+                    except OSError:
+                        pass # Port without modem control lines (pseudo-terminal of device emulator)
+                    self.connect = True             
+                    time.sleep(0.1) 
+                    self.ser.flushInput()
+                except SerialException :
+                    self.connect = False
+                    
+    def serialDisconnection(self):
+        self.ser.close()
+        self.connect = False
+    
+    # Read available data, waits up to timeout for the first byte
+    def serialRead(self):          
+        msg = bytes(0)
+        try:
+            self.backlog = self.ser.inWaiting()
+            msg = self.ser.read(max(1, self.backlog))
+            self.connect = True
+        except SerialException :
+            self.connect = False
+            try:
+               self.ser.close()
+               self.ser.open()
+               msg = bytes(0)
+            except SerialException :
+                pass
+            pass
+        return msg
+
+# Serial acquisition thread: owns serial port, decodes frames and fills ring buffer
+class SerialReader(threading.Thread):
+    # Custom constructor
+    def __init__(self, serialMonitor, capacity=2**18):
+        threading.Thread.__init__(self, daemon=True)
+        self.serialMonitor = serialMonitor
+        self.frameDecoder = FrameDecoder()
+        self.buffer = RingBuffer(SENSORS_MAX, capacity, np.uint16) # Raw ADC samples
+        self.commands = queue.Queue() # Single-byte commands for the device
+        self.running = False
+        self.period = 0.005 # Minimal time between serial reads in s
+        self.time = 0.0 # Time of the last sample in s
+        self.dt = 0.0 # Nominal time between samples in s
+        self.events = collections.deque() # Sample losses: (number of the first sample after loss in buffer, lost samples, kind)
+        self.window = 10 # Time window of device clock offset estimate in s
+        self.arrivals = collections.deque() # (host time, offset) of reads in window with increasing offsets
+        self.offset = None # Host time (time.monotonic) minus device time of samples in s
+        self.arrival = 0.0 # Host time of the last read with samples
+        self.device = 0 # Device number in DeviceManager
+        self.listeners = [] # Functions called in acquisition thread for each block: (reader, samples (channels, n), times, losses, read time.time())
+
+    # Send command byte to device from the acquisition thread
+    def command(self, value, flush=False):
+        self.commands.put((value, flush))
+
+    # Set gain number (index in GAINS) of sensor 0-5
+    def setGain(self, sensor, gain):
+        self.command((sensor + 1)*10 + gain)
+
+    # Set number of sensors sent by device, data received before are discarded
+    def setSensorsNumber(self, num):
+        self.command(int(num), flush=True)
+
+    # Listening port
+    def run(self):
+        self.running = True
+        while self.running:
+            while not self.commands.empty():
+                value, flush = self.commands.get_nowait()
+                try:
+                    self.serialMonitor.ser.write(bytearray([value]))
+                    if flush:
+                        self.serialMonitor.ser.flushInput()
+                        self.frameDecoder.restart()
+                        self.arrivals.clear()
+                except SerialException :
+                    self.serialMonitor.connect = False
+
+            msg = self.serialMonitor.serialRead()
+            received = time.time()
+            if len(msg) == 0:
+                if not self.serialMonitor.connect: time.sleep(self.serialMonitor.timeout)
+                continue
+
+            samples, dt = self.frameDecoder.decode(msg)
+            if len(dt) > 0:
+                times = self.time + np.cumsum(dt)
+                self.time = times[-1]
+                self.dt = self.frameDecoder.period
+                for index, lost, kind in self.frameDecoder.events:
+                    self.events.append((self.buffer.count + index, lost, kind))
+                self.buffer.write(samples.T, times)
+                self.updateClock(time.monotonic())
+                for listener in self.listeners:
+                    listener(self, samples.T, times, self.frameDecoder.events, received)
+
+            time.sleep(self.period)
+
+    # Device clock offset: minimum over window of read time minus device time of the last sample,
+    # given by the read with the smallest transfer delay
+    def updateClock(self, arrival):
+        offset = arrival - self.time
+        while len(self.arrivals) > 0 and self.arrivals[-1][1] >= offset:
+            self.arrivals.pop()
+        self.arrivals.append((arrival, offset))
+        while self.arrivals[0][0] < arrival - self.window:
+            self.arrivals.popleft()
+        self.offset = self.arrivals[0][1]
+        self.arrival = arrival
+
+    # Sample losses for block of n samples read from buffer up to cursor and samples lost by buffer
+    # overrun before the block: list of (index in block, lost samples, kind)
+    def takeEvents(self, cursor, n, overrun=0):
+        events = [(0, overrun, LOSS_OVERRUN)] if overrun > 0 else []
+        while len(self.events) > 0 and self.events[0][0] < cursor:
+            sample, lost, kind = self.events.popleft()
+            events.append((max(0, sample - (cursor - n)), lost, kind))
+        return events
+
+    # Stop thread and close serial port
+    def stop(self):
+        self.running = False
+        if self.is_alive(): self.join()
+        self.serialMonitor.serialDisconnection()
+
+# Several devices, each on its own serial port with acquisition thread. Samples of the first device give
+# time base, samples of other devices nearest in host time are added to them (device clocks are mapped to
+# host clock by SerialReader.offset). Channels of devices follow each other: sensors number of device 1,
+# then of device 2 and so on, rows up to SENSORS_MAX*devices are zero.
+class DeviceManager:
+    # Custom constructor, serialMonitors - connected ports, timeout - time in s after which device without
+    # data is not waited for
+    def __init__(self, serialMonitors, sensors=SENSORS_MAX, timeout=0.5):
+        self.readers = [SerialReader(monitor) for monitor in serialMonitors]
+        for d, reader in enumerate(self.readers): reader.device = d
+        self.channels = SENSORS_MAX*len(self.readers) # Rows of data blocks
+        self.sensors = sensors # Sensors number of each device
+        self.timeout = timeout
+        self.cursors = [0]*len(self.readers) # Number of samples taken from acquisition buffers
+        self.history = [(np.zeros((SENSORS_MAX, 0), np.uint16), np.zeros(0)) for reader in self.readers] # Samples and host times of devices 2..N
+        self.stalls = 0 # Number of reads when device was not waited for
+
+    def start(self):
+        for reader in self.readers: reader.start()
+
+    def stop(self):
+        for reader in self.readers: reader.stop()
+
+    # Nominal time between samples of the first device in s
+    @property
+    def dt(self):
+        return self.readers[0].dt
+
+    # All ports are connected
+    @property
+    def connect(self):
+        return all(reader.serialMonitor.connect for reader in self.readers)
+
+    # Call listener in acquisition thread of each device for every received block
+    def addListener(self, listener):
+        for reader in self.readers: reader.listeners.append(listener)
+
+    def removeListener(self, listener):
+        for reader in self.readers:
+            if listener in reader.listeners: reader.listeners.remove(listener)
+
+    # Bytes waiting in serial input buffers
+    def backlog(self):
+        return sum(reader.serialMonitor.backlog for reader in self.readers)
+
+    # Sum of frame decoders counter of all devices
+    def counter(self, name):
+        return sum(getattr(reader.frameDecoder, name) for reader in self.readers)
+
+    # Set number of sensors sent by each device
+    def setSensorsNumber(self, num):
+        self.sensors = int(num)
+        for reader in self.readers: reader.setSensorsNumber(num)
+
+    # Set gain number (index in GAINS) of channel
+    def setGain(self, channel, gain):
+        device, sensor = divmod(channel, self.sensors)
+        if device < len(self.readers): self.readers[device].setGain(sensor, gain)
+
+    # Samples (channels, n) received since previous read, their times in s (device time of the first device)
+    # and sample losses (index in block, lost samples, kind). Samples of the first device are returned when
+    # all devices sent samples of the same host time.
+    def read(self):
+        master = self.readers[0]
+        samples, times, count, overrun = master.buffer.read(self.cursors[0])
+        if len(self.readers) == 1:
+            self.cursors[0] = count
+            return samples, times, master.takeEvents(count, len(times), overrun)
+
+        # The latest host time received from all devices
+        now = time.monotonic()
+        hostTimes = times + (master.offset if master.offset is not None else 0)
+        limit = np.inf
+        for reader in self.readers[1:]:
+            if reader.offset is not None and now - reader.arrival < self.timeout:
+                limit = min(limit, reader.time + reader.offset)
+            else:
+                self.stalls += 1
+        n = int(np.searchsorted(hostTimes, limit, 'right'))
+        self.cursors[0] = count - (len(times) - n)
+        events = master.takeEvents(self.cursors[0], n, overrun)
+
+        block = np.zeros((self.channels, n), np.uint16)
+        block[:self.sensors] = samples[:self.sensors, :n]
+        for d, reader in enumerate(self.readers[1:], 1):
+            new, newTimes, self.cursors[d], lost = reader.buffer.read(self.cursors[d])
+            offset = reader.offset if reader.offset is not None else 0
+            for k, lost, kind in reader.takeEvents(self.cursors[d], len(newTimes), lost):
+                index = int(np.searchsorted(hostTimes[:n], newTimes[min(k, len(newTimes) - 1)] + offset)) if len(newTimes) > 0 else 0
+                events.append((min(index, max(n - 1, 0)), lost, kind))
+            history, historyTimes = self.history[d]
+            history = np.concatenate((history, new), axis=1)[:, -reader.buffer.capacity:]
+            historyTimes = np.concatenate((historyTimes, newTimes + offset))[-reader.buffer.capacity:]
+            if n > 0 and len(historyTimes) > 0:
+                # Nearest sample of device for each sample of the first device
+                index = np.clip(np.searchsorted(historyTimes, hostTimes[:n]), 1, max(1, len(historyTimes) - 1))
+                if len(historyTimes) > 1:
+                    index -= hostTimes[:n] - historyTimes[index - 1] < historyTimes[index] - hostTimes[:n]
+                else:
+                    index[:] = 0
+                block[d*self.sensors: (d + 1)*self.sensors] = history[:self.sensors, index]
+                history, historyTimes = history[:, max(0, index[-1] - 1):], historyTimes[max(0, index[-1] - 1):]
+            self.history[d] = (history, historyTimes)
+        events.sort()
+        return block, times[:n], events
@@ -0,0 +1,207 @@
+# ELEMYO device emulator: pseudo-terminal speaking the protocol of Arduino_Firmware.ino (Linux, macOS)
+# 2026-10-17 by ELEMYO (https://github.com/ELEMYO/ELEMYO-GUI)
+#
+# Changelog:
+#     2026-10-17 - damaged serial data and frames dropped by device (time gaps)
+#     2026-10-17 - initial release, synthetic EMG, mains hum and noise bursts
+#
+# Usage:
+#     python ELEMYO_emulator.py [--fs 1572] [--sensors 1] [--mains 50] [--link /tmp/ttyELEMYO]
+#     ELEMYO_PORTS=/dev/pts/N python ELEMYO_GUI.py  (port name is printed by emulator)
+#
+# Frames are 16 bytes: 6 x uint16 sensor data, uint16 time from previous frame in us, 0xFFFF.
+# Data of sensors above sensors number are zero. Command bytes: value < 7 - sensors number,
+# otherwise (sensor + 1)*10 + gain index.
+
+
+# Code is placed under the MIT license
+# Copyright (c) 2020 ELEMYO
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import sys
+import tty
+import time
+import select
+import argparse
+import numpy as np
+from scipy.signal import sosfilt
+from ELEMYO_core import GAINS, SENSORS_MAX, FRAME_DTYPE, FRAME_END, butter_sos
+
+# Synthetic signal source and command interpreter of ELEMYO device
+class DeviceEmulator:
+    # Custom constructor. Amplitudes are in ADC units at gain 1.
+    def __init__(self, fs=1572, sensors=1, ADCbits=10, emg=60, contraction=4, mains=50, hum=15, bursts=0.2, jitter=0, seed=None, errors=0):
+        self.fs = fs # Sampling frequency in Hz
+        self.sensorsNumber = sensors # Number of sensors sent in frames, set by command
+        self.gains = [0]*SENSORS_MAX # Gain index of each sensor, set by command
+        self.ADCbits = ADCbits
+        self.emg = emg # EMG amplitude (standard deviation) during contraction
+        self.contraction = contraction # Contraction cycle period in s, half of cycle is contraction
+        self.mains = mains # Mains frequency in Hz, 0 - no hum
+        self.hum = hum # Mains hum amplitude
+        self.bursts = bursts # Mean number of noise bursts per second
+        self.jitter = jitter # Standard deviation of frame time in us
+        self.errors = errors # Mean number of damaged bytes (removed, inserted or changed) per second
+        self.delay = 0.0 # Time of dropped frames in us, added to time of the next frame
+        self.rng = np.random.default_rng(seed)
+        self.sos = butter_sos('bandpass', 20, min(450, 0.45*fs), fs) # EMG spectrum
+        self.zi = np.zeros((len(self.sos), SENSORS_MAX, 2))
+        self.phase = self.rng.uniform(0, 1, SENSORS_MAX) # Contraction cycle phase of each sensor
+        self.burst = np.zeros(SENSORS_MAX, int) # Remaining samples of noise burst
+        self.sample = 0 # Number of generated samples
+        self.frames = 0 # Number of sent frames
+        self.overflows = 0 # Number of frames dropped because port was not read
+
+    # Apply command byte received from host
+    def command(self, value):
+        if value < 7:
+            self.sensorsNumber = value
+        elif value//10 - 1 < SENSORS_MAX and value%10 < len(GAINS):
+            self.gains[value//10 - 1] = value%10
+
+    # Next n frames (FRAME_DTYPE array)
+    def generate(self, n):
+        t = (self.sample + np.arange(n))/self.fs
+        emg, self.zi = sosfilt(self.sos, self.rng.standard_normal((SENSORS_MAX, n))*3, axis=-1, zi=self.zi)
+        active = ((t[None, :]/self.contraction + self.phase[:, None]) % 1) < 0.5
+        signal = emg*self.emg*(0.05 + 0.95*active)
+        if self.mains > 0:
+            signal += self.hum*(np.sin(2*np.pi*self.mains*t) + 0.3*np.sin(2*np.pi*3*self.mains*t))
+        
+        # Noise bursts (movement artifacts) of 50 ms starting at random samples
+        length = int(0.05*self.fs)
+        for i in range(SENSORS_MAX):
+            mask = np.zeros(n, bool)
+            mask[:self.burst[i]] = True
+            for start in np.flatnonzero(self.rng.random(n) < self.bursts/self.fs):
+                mask[start: start + length] = True
+                self.burst[i] = max(self.burst[i], start + length)
+            self.burst[i] = max(0, self.burst[i] - n)
+            signal[i, mask] += self.rng.standard_normal(np.count_nonzero(mask))*5*self.emg
+        
+        signal *= np.array([GAINS[g] for g in self.gains])[:, None]
+        frames = np.zeros(n, FRAME_DTYPE)
+        frames['data'] = np.clip(np.round(2**self.ADCbits*0.5 + signal), 0, 2**self.ADCbits - 1).T
+        frames['data'][:, self.sensorsNumber:] = 0
+        dt = 1e6/self.fs + self.jitter*self.rng.standard_normal(n)
+        dt[0] += self.delay
+        self.delay = 0.0
+        frames['dt'] = np.clip(np.round(dt), 1, 65535)
+        frames['end'] = FRAME_END
+        self.sample += n
+        return frames
+
+    # Damage random bytes of serial data (noise on the line)
+    def damage(self, data):
+        data = bytearray(data)
+        for pos in sorted(self.rng.integers(0, len(data), self.rng.poisson(self.errors*len(data)/FRAME_DTYPE.itemsize/self.fs)), reverse=True):
+            kind = self.rng.integers(3)
+            if kind == 0: del data[pos]
+            elif kind == 1: data.insert(pos, int(self.rng.integers(256)))
+            else: data[pos] = int(self.rng.integers(256))
+        return bytes(data)
+
+    # Open pseudo-terminal, returns name of port for host
+    def open(self, link=''):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+        if link != '':
+            if os.path.islink(link): os.remove(link)
+            os.symlink(self.port, link)
+        return self.port
+
+    # Send frames in real time and receive commands. Frames which do not fit into pseudo-terminal
+    # buffer (port is not read by host) are dropped, their time is added to the next frame as device does.
+    def run(self, duration=0, report=0):
+        start = time.monotonic()
+        reportTime = start
+        while duration <= 0 or time.monotonic() - start < duration:
+            n = int((time.monotonic() - start)*self.fs) - self.sample
+            if n > 0:
+                data = self.generate(n).tobytes()
+                if self.errors > 0:
+                    data = self.damage(data)
+                try:
+                    written = os.write(self.master, data)
+                except BlockingIOError:
+                    written = 0
+                sent = written//FRAME_DTYPE.itemsize
+                if written % FRAME_DTYPE.itemsize != 0:
+                    # Rest of partially written frame, so host receives whole frames
+                    os.set_blocking(self.master, True)
+                    os.write(self.master, data[written: written + FRAME_DTYPE.itemsize - written % FRAME_DTYPE.itemsize])
+                    os.set_blocking(self.master, False)
+                    sent += 1
+                self.frames += sent
+                self.overflows += n - sent
+                self.delay += (n - sent)*1e6/self.fs
+
+            if select.select([self.master], [], [], 0.002)[0]:
+                try:
+                    for value in os.read(self.master, 64):
+                        self.command(value)
+                except OSError:
+                    pass
+
+            if report > 0 and time.monotonic() - reportTime >= report:
+                reportTime = time.monotonic()
+                print("%8.0f s: %d frames sent, %d dropped, %d sensors, gains %s" % (reportTime - start, self.frames, self.overflows, self.sensorsNumber,
+                                                                                    [GAINS[g] for g in self.gains[:max(1, self.sensorsNumber)]]))
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+def main():
+    parser = argparse.ArgumentParser(description='ELEMYO device emulator on pseudo-terminal')
+    parser.add_argument('--fs', type=float, default=1572, help='sampling frequency in Hz')
+    parser.add_argument('--sensors', type=int, default=1, choices=range(0, 7), help='initial sensors number (changed by host command)')
+    parser.add_argument('--adc', type=int, default=10, help='ADC resolution in bits')
+    parser.add_argument('--emg', type=float, default=60, help='EMG amplitude in ADC units at gain 1')
+    parser.add_argument('--contraction', type=float, default=4, help='muscle contraction cycle in s')
+    parser.add_argument('--mains', type=float, default=50, help='mains hum frequency in Hz, 0 - no hum')
+    parser.add_argument('--hum', type=float, default=15, help='mains hum amplitude in ADC units')
+    parser.add_argument('--bursts', type=float, default=0.2, help='noise bursts per second')
+    parser.add_argument('--jitter', type=float, default=0, help='frame time jitter in us')
+    parser.add_argument('--errors', type=float, default=0, help='damaged bytes per second (removed, inserted or changed)')
+    parser.add_argument('--seed', type=int, default=None, help='random generator seed')
+    parser.add_argument('--duration', type=float, default=0, help='run time in s, 0 - until Ctrl+C')
+    parser.add_argument('--link', default='', help='symbolic link to created port, e.g. /tmp/ttyELEMYO')
+    parser.add_argument('--report', type=float, default=10, help='status report period in s')
+    args = parser.parse_args()
+
+    emulator = DeviceEmulator(args.fs, args.sensors, args.adc, args.emg, args.contraction, args.mains, args.hum, args.bursts, args.jitter, args.seed, args.errors)
+    port = emulator.open(args.link)
+    print("ELEMYO emulator on " + port + ", sampling frequency = " + str(args.fs) + " Hz")
+    print("    GUI:       ELEMYO_PORTS=" + port + " python ELEMYO_GUI.py")
+    print("    recording: python ELEMYO_GUI.py record --port " + port)
+    sys.stdout.flush()
+    try:
+        emulator.run(args.duration, args.report)
+    except KeyboardInterrupt:
+        pass
+    emulator.close()
+    if args.link != '' and os.path.islink(args.link): os.remove(args.link)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,835 @@
+# Recording files of ELEMYO GUI: reading and playback (no Qt dependencies)
+# 2026-10-17 by ELEMYO (https://github.com/ELEMYO/ELEMYO-GUI)
+#
+# Changelog:
+#     2026-10-17 - EMG features files, features output of converter
+#     2026-10-17 - converter processing by EMGPipeline, μV output, custom stages
+#     2026-10-17 - recording from several devices
+#     2026-10-17 - sample loss events in recordings
+#     2026-10-17 - multi-resolution overview of recordings
+#     2026-10-17 - parallel batch converter and filter of recordings
+#     2026-10-17 - headless acquisition and recording from command line
+#     2026-10-17 - chunked recording format v2 with timestamps, CRC, compression and index
+#     2026-10-17 - background recording writer
+#     2026-10-17 - real-time playback clock with speed multiplier
+#     2026-10-17 - initial release, memory-mapped reader of *.bin recordings
+#
+# Command line (no graphical interface, Qt is not required):
+#     python ELEMYO_GUI.py record --port COM3 --sensors 4 --gain 8 --duration 3600
+#     python ELEMYO_GUI.py record --port COM3,COM4 --sensors 6  (12 channels of two devices, aligned on computer clock)
+#     python ELEMYO_GUI.py convert recordings/ --format csv --bandpass 10 500 --notch 50 --signal envelope
+#     python ELEMYO_GUI.py convert recording.bin --uv --stage my_stages:Rectifier  (custom stage class, see EMGPipeline)
+#     python ELEMYO_GUI.py convert recording.bin --signal features --format csv --bandpass 20 450 --window 256 --hop 64
+#
+# Features file (*.csv, *.txt) - header line 'time RMS 1 ... RMS n MAV 1 ...', then line for each window: time of its
+# last sample in s and features of all channels grouped by feature (see FEATURES of ELEMYO_analysis)
+#
+# Recording file format v2 (*.bin), all numbers are little-endian:
+#     header - 'ELMY', uint16 version, uint16 channels, uint16 ADC bits, uint16 codec,
+#              float64 sampling frequency in Hz, float64 start time (unix), uint8 gain index of each channel
+#     chunks - 'CHNK', uint32 samples number, uint64 first sample number, float64 first sample time in s,
+#              uint32 payload length, uint32 CRC-32 of payload; payload (compressed by codec) -
+#              uint32 time from first sample of chunk in us for each sample, then uint16 data (samples, channels);
+#              chunk is split if its samples span more than uint32 range (about 71 min)
+#     events - 'EVNT' chunks between data chunks, same header (uint32 events number, first event sample number and time),
+#              payload - for each sample loss: uint64 number of the first sample after loss, float64 its time in s,
+#              uint32 lost samples, uint16 kind (1 - damaged serial data, 2 - device time gap, 3 - acquisition buffer overrun)
+#     index  - 'INDX', uint32 chunks number, for each chunk: uint64 first sample number,
+#              float64 first sample time in s, uint64 chunk offset in file
+#     footer - 'IEND', uint64 index offset. Recordings without index (interrupted) are read by scanning chunks.
+#
+# Recording file format v1 (*.bin, ELEMYO GUI before v2, read only):
+#     header - 8 x uint16: ADC bits, sampling frequency in Hz, gain index of sensors 1-6
+#     data   - 6 x uint16 for each sample: ADC value of sensors 1-6
+#
+# Overview file (*.ovr, next to *.bin recording), min/max/mean/RMS of samples for buckets of 2^k samples:
+#     header - 'ELOV', uint16 version, uint16 channels, uint16 first level, uint16 levels number,
+#              uint64 recording samples number, uint64 recording file size, float64 recording modification time
+#     levels - for each level from the first one (2^first samples in bucket), for each bucket:
+#              uint16 min, uint16 max (channels), float32 mean, float32 RMS (channels)
+#
+# Text file format (*.txt): date and time of recording, format description and one line
+# for each sample: time in s and data of sensors 1-6 separated by spaces
+
+# Code is placed under the MIT license
+# Copyright (c) 2020 ELEMYO
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+# ===============================================
+
+import os
+import sys
+import time
+import argparse
+import threading
+import queue
+import concurrent.futures
+import struct
+import zlib
+from datetime import datetime
+import numpy as np
+from ELEMYO_core import GAINS, SENSORS_MAX, LOSS_OVERRUN, SerialMonitor, DeviceManager, EMGPipeline, loadStages, gainIndices
+from ELEMYO_analysis import FEATURES, Features
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+HEADER_SIZE = 16 # Header length of v1 file in bytes
+CHANNELS = 6 # Number of sensors stored in v1 file
+PLAYBACK_SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16) # Available playback speed multipliers
+
+FILE_MAGIC = b'ELMY'
+FILE_VERSION = 2
+FILE_HEADER = struct.Struct('<4sHHHHdd')
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sIQdII')
+EVENT_MAGIC = b'EVNT'
+EVENT_ENTRY = np.dtype([('sample', '<u8'), ('time', '<f8'), ('lost', '<u4'), ('kind', '<u2')])
+INDEX_MAGIC = b'INDX'
+INDEX_ENTRY = np.dtype([('sample', '<u8'), ('time', '<f8'), ('offset', '<u8')])
+FOOTER_MAGIC = b'IEND'
+FOOTER = struct.Struct('<4sQ')
+CODECS = ('none', 'zlib', 'lz4') # Payload compression, index - codec number in file header
+CONVERT_FORMATS = ('txt', 'csv', 'npy') # Output formats of batch converter
+CONVERT_BLOCK = 2**16 # Samples number processed at once by batch converter
+OVERVIEW_MAGIC = b'ELOV'
+OVERVIEW_VERSION = 1
+OVERVIEW_HEADER = struct.Struct('<4sHHHHQQd')
+OVERVIEW_BASE = 5 # First stored level, buckets of 32 samples. Finer levels are computed from samples
+
+# Compress chunk payload
+def compress(payload, codec):
+    if codec == 1: return zlib.compress(payload, 1)
+    if codec == 2: return lz4.compress(payload)
+    return payload
+
+# Decompress chunk payload
+def decompress(payload, codec):
+    if codec == 1: return zlib.decompress(payload)
+    if codec == 2:
+        if lz4 is None: raise ValueError("lz4 package is required to read this recording")
+        return lz4.decompress(payload)
+    return payload
+
+# Text lines of recording file for samples block (channels, n) and times (n)
+def formatText(samples, times, separator=' ', end=' \n'):
+    if len(times) == 0:
+        return ''
+    # Python float to str conversion gives the same text as str(round(x, 3)) of the old per-sample writer
+    columns = [map(str, np.round(times, 3).tolist())] + [map(str, channel.tolist()) for channel in np.round(np.asarray(samples, float), 3)]
+    return end.join(map(separator.join, zip(*columns))) + end
+
+# Writer of features file, rows of Features.process: times (m,) and values (m, channels, features)
+class FeaturesWriter:
+    # Custom constructor
+    def __init__(self, fileName, channels, separator=','):
+        self.separator = separator
+        self.channels = channels
+        self.rows = 0 # Number of written windows
+        self.file = open(fileName, 'w')
+        self.file.write(separator.join(['time'] + [name + ' ' + str(i + 1) for name in FEATURES for i in range(channels)]) + '\n')
+
+    def write(self, times, values):
+        if len(times) == 0:
+            return
+        # Columns of file header are kept if number of channels was changed
+        if values.shape[1] != self.channels:
+            values = np.pad(values[:, :self.channels], ((0, 0), (0, max(0, self.channels - values.shape[1])), (0, 0)))
+        self.file.write(formatText(np.transpose(values, (2, 1, 0)).reshape(-1, len(times)), times, self.separator, '\n'))
+        self.rows += len(times)
+
+    def close(self):
+        self.file.close()
+
+# Writer of v2 recording file: data are collected into chunks, index is written on close
+class ChunkWriter:
+    # Custom constructor
+    def __init__(self, fileName, channels, ADCbits, fs, gains, codec='none', chunkSamples=4096):
+        if codec == 'lz4' and lz4 is None:
+            raise ValueError("lz4 package is not installed")
+        self.channels = channels
+        self.fs = fs
+        self.codec = CODECS.index(codec)
+        self.chunkSamples = chunkSamples # Samples number in one chunk
+        self.samples = [] # Data blocks of chunk being collected
+        self.times = [] # Time blocks of chunk being collected
+        self.pending = 0 # Samples number in chunk being collected
+        self.count = 0 # Samples number written to file
+        self.index = [] # (first sample, time, offset) of written chunks
+        self.events = [] # (sample, time, lost, kind) of sample losses not written yet
+
+        self.file = open(fileName, 'wb')
+        self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, channels, ADCbits, self.codec, fs, time.time()))
+        self.file.write(bytes(list(gains)[:channels]).ljust(channels, b'\0'))
+
+    # Add samples block (channels, n) with times (n) in s and losses (index of sample after loss in block, lost samples, kind)
+    def write(self, samples, times, events=()):
+        for k, lost, kind in events:
+            self.events.append((self.count + self.pending + k, times[min(k, len(times) - 1)] if len(times) > 0 else 0, lost, kind))
+        self.samples.append(np.asarray(samples)[:self.channels])
+        self.times.append(np.asarray(times, float))
+        self.pending += len(times)
+        if self.pending >= self.chunkSamples:
+            self.flush()
+
+    # Write collected samples as chunk, then collected sample losses
+    def flush(self):
+        if len(self.events) > 0:
+            payload = np.array(self.events, EVENT_ENTRY).tobytes()
+            self.file.write(CHUNK_HEADER.pack(EVENT_MAGIC, len(self.events), self.events[0][0], self.events[0][1], len(payload), zlib.crc32(payload)))
+            self.file.write(payload)
+            self.events = []
+        if self.pending == 0:
+            return
+        samples = np.concatenate(self.samples, axis=1)
+        times = np.concatenate(self.times)
+        self.samples, self.times, self.pending = [], [], 0
+
+        # Sample times are stored relative to float64 time of chunk, so rounding to us does not accumulate
+        start = 0
+        while start < len(times):
+            offsets = np.round((times[start:] - times[start])*1e6)
+            over = np.flatnonzero(offsets > 0xFFFFFFFF)
+            end = start + (int(over[0]) if len(over) > 0 else len(offsets))
+            self.writeChunk(samples[:, start: end], times[start], np.clip(offsets[:end - start], 0, None))
+            start = end
+
+    # Write chunk of samples (channels, n), time of its first sample in s and sample times from it in us (n)
+    def writeChunk(self, samples, t0, offsets):
+        payload = compress(offsets.astype('<u4').tobytes() + samples.T.astype('<u2').tobytes(), self.codec)
+        self.index.append((self.count, t0, self.file.tell()))
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(offsets), self.count, t0, len(payload), zlib.crc32(payload)))
+        self.file.write(payload)
+        self.count += len(offsets)
+
+    # Write file buffers to disk
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    # Write last chunk, chunks index and close file
+    def close(self):
+        self.flush()
+        offset = self.file.tell()
+        self.file.write(INDEX_MAGIC + struct.pack('<I', len(self.index)))
+        self.file.write(np.array(self.index, INDEX_ENTRY).tobytes())
+        self.file.write(FOOTER.pack(FOOTER_MAGIC, offset))
+        self.sync()
+        self.file.close()
+
+# Background writer of recording files (*.bin and *.txt), fed by queue of data blocks
+class RecordingWriter(threading.Thread):
+    # Custom constructor, fileName - recording file name without extension
+    def __init__(self, fileName, channels, ADCbits, fs, gains, codec='none', text=True, queueSize=256, syncPeriod=5):
+        threading.Thread.__init__(self, daemon=True)
+        self.fileNameBIN = fileName + '.bin'
+        self.fileNameTXT = fileName + '.txt'
+        self.queue = queue.Queue(queueSize) # Data blocks waiting for writing
+        self.syncPeriod = syncPeriod # Time between flushes of files to disk in s
+        self.stalls = 0 # Number of times when queue was full and caller waited
+        self.samples = 0 # Number of written samples
+
+        self.fileBIN = ChunkWriter(self.fileNameBIN, channels, ADCbits, fs, gains, codec)
+
+        self.fileTXT = None
+        if text:
+            self.fileTXT = open(self.fileNameTXT, 'a')
+            self.fileTXT.write(datetime.now().strftime("Date: %Y.%m.%d\rTime: %H:%M:%S") + "\r\n")
+            self.fileTXT.write("File format: \r\ntime in s | 6 sensor data points in in mkV\r\n")
+
+    # Queue samples block (channels, n) with times (n) and sample losses (see ChunkWriter.write) for writing
+    def submit(self, samples, times, events=()):
+        block = (np.array(samples, np.uint16), np.array(times), list(events))
+        try:
+            self.queue.put_nowait(block)
+        except queue.Full:
+            self.stalls += 1
+            self.queue.put(block)
+
+    def run(self):
+        syncTime = time.monotonic()
+        running = True
+        while running:
+            blocks = [self.queue.get()]
+            while not self.queue.empty():
+                blocks.append(self.queue.get_nowait())
+            if blocks[-1] is None:
+                running = False
+                blocks.pop()
+
+            if len(blocks) > 0:
+                samples = np.concatenate([b[0] for b in blocks], axis=1)
+                times = np.concatenate([b[1] for b in blocks])
+                events, offset = [], 0
+                for b in blocks:
+                    events += [(offset + k, lost, kind) for k, lost, kind in b[2]]
+                    offset += len(b[1])
+                self.fileBIN.write(samples, times, events)
+                if self.fileTXT is not None: self.fileTXT.write(formatText(samples, times))
+                self.samples += len(times)
+
+            if time.monotonic() - syncTime > self.syncPeriod and running:
+                self.fileBIN.flush()
+                self.fileBIN.sync()
+                if self.fileTXT is not None:
+                    self.fileTXT.flush()
+                    os.fsync(self.fileTXT.fileno())
+                syncTime = time.monotonic()
+
+        self.fileBIN.close()
+        if self.fileTXT is not None: self.fileTXT.close()
+
+    # Write queued data and close files
+    def close(self):
+        self.queue.put(None)
+        self.join()
+
+# Reader of v1 recording, samples are memory-mapped and loaded on access
+class LegacyRecording:
+    # Custom constructor
+    def __init__(self, fileName):
+        self.fileName = fileName
+        if os.path.getsize(fileName) < HEADER_SIZE:
+            raise ValueError("recording " + fileName + " is damaged (file is shorter than header)")
+        header = np.fromfile(fileName, '<u2', HEADER_SIZE//2)
+        self.version = 1
+        self.ADCbits = int(header[0]) # ADC resolution in bits
+        self.fs = int(header[1]) # Sampling frequency in Hz
+        self.gains = [int(g) for g in header[2:]] # Gain index of sensors 1-6
+        self.channels = CHANNELS
+        self.length = (os.path.getsize(fileName) - HEADER_SIZE)//(2*CHANNELS) # Number of samples
+        if self.length > 0:
+            self.data = np.memmap(fileName, '<u2', 'r', HEADER_SIZE, (self.length, CHANNELS))
+        else:
+            self.data = np.zeros((0, CHANNELS), np.uint16)
+
+    # Samples (channels, n) starting from sample number start and their time in s
+    def read(self, start, n):
+        samples = np.array(self.data[start: start + n].T)
+        times = np.arange(start, start + len(samples[0]))/self.fs
+        return samples, times
+
+    # Sample number for time in s
+    def seek(self, t):
+        return min(max(int(t*self.fs), 0), self.length)
+
+    # Time in s of samples with given numbers
+    def sampleTime(self, samples):
+        return np.asarray(samples)/self.fs
+
+    # Sample losses, not stored in v1 file
+    def readEvents(self):
+        return np.zeros(0, EVENT_ENTRY)
+
+    # Release file mapping
+    def close(self):
+        self.data = np.zeros((0, CHANNELS), np.uint16)
+        self.length = 0
+
+# Reader of v2 recording, chunks are memory-mapped and decoded on access
+class ChunkedRecording:
+    # Custom constructor
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.file = np.memmap(fileName, np.uint8, 'r')
+        if len(self.file) < FILE_HEADER.size:
+            raise ValueError("recording " + fileName + " is damaged (file is shorter than header)")
+        magic, self.version, self.channels, self.ADCbits, self.codec, self.fs, self.startTime = FILE_HEADER.unpack_from(self.file, 0)
+        self.gains = [int(g) for g in self.file[FILE_HEADER.size: FILE_HEADER.size + self.channels]]
+        self.dataOffset = FILE_HEADER.size + self.channels
+        self.readIndex()
+        self.chunk = None # Last decoded chunk: (number, samples, times)
+
+    # Load chunks index from file end or rebuild it by scanning chunks
+    def readIndex(self):
+        index = None
+        if len(self.file) >= self.dataOffset + FOOTER.size:
+            magic, offset = FOOTER.unpack_from(self.file, len(self.file) - FOOTER.size)
+            if magic == FOOTER_MAGIC and bytes(self.file[offset: offset + 4]) == INDEX_MAGIC:
+                count = struct.unpack_from('<I', self.file, offset + 4)[0]
+                index = np.frombuffer(self.file, INDEX_ENTRY, count, offset + 8)
+        if index is None:
+            entries = []
+            offset = self.dataOffset
+            while offset + CHUNK_HEADER.size <= len(self.file):
+                magic, n, first, t0, size, crc = CHUNK_HEADER.unpack_from(self.file, offset)
+                if magic not in (CHUNK_MAGIC, EVENT_MAGIC) or offset + CHUNK_HEADER.size + size > len(self.file):
+                    break
+                if magic == CHUNK_MAGIC: entries.append((first, t0, offset))
+                offset += CHUNK_HEADER.size + size
+            index = np.array(entries, INDEX_ENTRY)
+        self.index = index
+        self.lastTime = None # Time of last sample, read on demand
+        self.events = None # Sample losses, read on demand
+        if len(index) > 0:
+            self.length = int(index['sample'][-1]) + CHUNK_HEADER.unpack_from(self.file, int(index['offset'][-1]))[1]
+        else:
+            self.length = 0
+
+    # Decode chunk by its number in index, returns samples (channels, n) and times (n)
+    def readChunk(self, number):
+        if self.chunk is not None and self.chunk[0] == number:
+            return self.chunk[1], self.chunk[2]
+        offset = int(self.index['offset'][number])
+        magic, n, first, t0, size, crc = CHUNK_HEADER.unpack_from(self.file, offset)
+        payload = bytes(self.file[offset + CHUNK_HEADER.size: offset + CHUNK_HEADER.size + size])
+        if zlib.crc32(payload) != crc:
+            raise ValueError("recording chunk " + str(number) + " is damaged (CRC error)")
+        payload = decompress(payload, self.codec)
+        offsets = np.frombuffer(payload, '<u4', n)
+        samples = np.frombuffer(payload, '<u2', n*self.channels, 4*n).reshape(n, self.channels).T
+        times = t0 + offsets*1e-6
+        self.chunk = (number, samples, times)
+        return samples, times
+
+    # Samples (channels, n) starting from sample number start and their time in s
+    def read(self, start, n):
+        n = max(0, min(n, self.length - start))
+        samples, times = [np.zeros((self.channels, 0), np.uint16)], [np.zeros(0)]
+        number = np.searchsorted(self.index['sample'], start, 'right') - 1
+        while n > 0:
+            chunkSamples, chunkTimes = self.readChunk(number)
+            begin = start - int(self.index['sample'][number])
+            end = min(begin + n, len(chunkTimes))
+            samples.append(chunkSamples[:, begin: end])
+            times.append(chunkTimes[begin: end])
+            start += end - begin
+            n -= end - begin
+            number += 1
+        return np.concatenate(samples, axis=1), np.concatenate(times)
+
+    # Sample number for time in s: binary search of chunk in index, then of sample in decoded chunk
+    # (sample times are stored with 1 us resolution)
+    def seek(self, t):
+        number = np.searchsorted(self.index['time'], t, 'right') - 1
+        if number < 0:
+            return 0
+        samples, times = self.readChunk(number)
+        return int(self.index['sample'][number]) + int(np.searchsorted(times, t - 0.5e-6))
+
+    # Time in s of samples with given numbers, interpolated between chunks start times
+    def sampleTime(self, samples):
+        if self.length == 0:
+            return np.asarray(samples)/self.fs
+        if self.lastTime is None:
+            self.lastTime = self.readChunk(len(self.index) - 1)[1][-1]
+        return np.interp(samples, np.append(self.index['sample'], self.length - 1), np.append(self.index['time'], self.lastTime))
+
+    # Sample losses (EVENT_ENTRY array) from event chunks, chunk headers are scanned at first call
+    def readEvents(self):
+        if self.events is None:
+            events = [np.zeros(0, EVENT_ENTRY)]
+            offset = self.dataOffset
+            while offset + CHUNK_HEADER.size <= len(self.file):
+                magic, n, first, t0, size, crc = CHUNK_HEADER.unpack_from(self.file, offset)
+                if magic not in (CHUNK_MAGIC, EVENT_MAGIC) or offset + CHUNK_HEADER.size + size > len(self.file):
+                    break
+                if magic == EVENT_MAGIC:
+                    payload = bytes(self.file[offset + CHUNK_HEADER.size: offset + CHUNK_HEADER.size + size])
+                    if zlib.crc32(payload) == crc:
+                        events.append(np.frombuffer(payload, EVENT_ENTRY, n))
+                offset += CHUNK_HEADER.size + size
+            self.events = np.concatenate(events)
+        return self.events
+
+    # Release file mapping
+    def close(self):
+        self.file = np.zeros(0, np.uint8)
+        self.index = np.zeros(0, INDEX_ENTRY)
+        self.chunk = None
+        self.length = 0
+
+# Open v1 or v2 recording file
+def openRecording(fileName):
+    with open(fileName, 'rb') as file:
+        magic = file.read(len(FILE_MAGIC))
+    if magic == FILE_MAGIC:
+        return ChunkedRecording(fileName)
+    return LegacyRecording(fileName)
+
+# Bucket statistics record of overview level
+def overviewDtype(channels):
+    return np.dtype([('min', '<u2', (channels,)), ('max', '<u2', (channels,)), ('mean', '<f4', (channels,)), ('rms', '<f4', (channels,))])
+
+# Min/max/mean/RMS of samples (channels, n) in buckets starting at positions starts
+def reduceBuckets(samples, starts):
+    samples = np.asarray(samples, float)
+    counts = np.diff(np.append(starts, samples.shape[1]))
+    return (np.minimum.reduceat(samples, starts, axis=1), np.maximum.reduceat(samples, starts, axis=1),
+            np.add.reduceat(samples, starts, axis=1)/counts, np.sqrt(np.add.reduceat(samples**2, starts, axis=1)/counts))
+
+# Multi-resolution overview of recording: min/max/mean/RMS pyramid with buckets of 2^k samples,
+# stored in overview file next to recording. Query cost depends on requested pixels number only.
+class RecordingOverview:
+    # Custom constructor, recording - opened v1 or v2 recording. Overview file is built if it is missing or outdated,
+    # recording without samples has empty overview and no overview file.
+    def __init__(self, recording):
+        self.recording = recording
+        self.fileName = os.path.splitext(recording.fileName)[0] + '.ovr'
+        self.built = False # Overview file was built by constructor
+        self.levels = [] # Memory-mapped levels, index - level number minus OVERVIEW_BASE
+        if recording.length == 0:
+            return
+        if not self.load():
+            self.build()
+            self.built = True
+            self.load()
+
+    # Open overview file, returns False if it is missing or does not correspond to recording
+    def load(self):
+        if not os.path.exists(self.fileName) or os.path.getsize(self.fileName) < OVERVIEW_HEADER.size:
+            return False
+        with open(self.fileName, 'rb') as file:
+            magic, version, channels, base, levels, length, size, mtime = OVERVIEW_HEADER.unpack(file.read(OVERVIEW_HEADER.size))
+        if (magic != OVERVIEW_MAGIC or version != OVERVIEW_VERSION or channels != self.recording.channels or base != OVERVIEW_BASE or
+            length != self.recording.length or size != os.path.getsize(self.recording.fileName) or mtime != os.path.getmtime(self.recording.fileName)):
+            return False
+        self.levels = []
+        offset = OVERVIEW_HEADER.size
+        dtype = overviewDtype(channels)
+        for k in range(base, base + levels):
+            count = -(-length//2**k)
+            self.levels.append(np.memmap(self.fileName, dtype, 'r', offset, (count,)))
+            offset += count*dtype.itemsize
+        return True
+
+    # Compute all levels from recording samples and write overview file
+    def build(self):
+        recording = self.recording
+        dtype = overviewDtype(recording.channels)
+        bucket = 2**OVERVIEW_BASE
+        level = np.zeros(-(-recording.length//bucket), dtype)
+        for start in range(0, recording.length, CONVERT_BLOCK):
+            samples, times = recording.read(start, CONVERT_BLOCK)
+            buckets = level[start//bucket: start//bucket + -(-len(times)//bucket)]
+            minimum, maximum, mean, rms = reduceBuckets(samples, np.arange(0, len(times), bucket))
+            buckets['min'], buckets['max'], buckets['mean'], buckets['rms'] = minimum.T, maximum.T, mean.T, rms.T
+
+        levels = [level]
+        while len(level) > 1:
+            # Pairs of buckets are merged, weights are samples numbers (last bucket may be incomplete)
+            counts = np.full(len(level), float(bucket))
+            counts[-1] = recording.length - (len(level) - 1)*bucket
+            if len(level) % 2 == 1:
+                level = np.append(level, level[-1:])
+                counts = np.append(counts, 0)
+            pairs = level.reshape(-1, 2)
+            weights = counts.reshape(-1, 2, 1)
+            merged = np.zeros(len(pairs), dtype)
+            merged['min'] = pairs['min'].min(axis=1)
+            merged['max'] = pairs['max'].max(axis=1)
+            merged['mean'] = (pairs['mean']*weights).sum(axis=1)/weights.sum(axis=1)
+            merged['rms'] = np.sqrt((pairs['rms']**2*weights).sum(axis=1)/weights.sum(axis=1))
+            level = merged
+            bucket *= 2
+            levels.append(level)
+
+        with open(self.fileName, 'wb') as file:
+            file.write(OVERVIEW_HEADER.pack(OVERVIEW_MAGIC, OVERVIEW_VERSION, recording.channels, OVERVIEW_BASE, len(levels), recording.length,
+                                            os.path.getsize(recording.fileName), os.path.getmtime(recording.fileName)))
+            for level in levels:
+                file.write(level.tobytes())
+
+    # Statistics of samples from start to end for about pixels buckets. Returns sample numbers of
+    # buckets beginning and min, max, mean, RMS (channels, buckets). Buckets are single samples at full zoom.
+    def query(self, start, end, pixels):
+        start = max(0, int(start))
+        end = min(self.recording.length, int(end))
+        if end <= start:
+            empty = np.zeros((self.recording.channels, 0))
+            return np.zeros(0, np.int64), empty, empty, empty, empty
+        bucket = (end - start)/max(1, pixels)
+        k = min(int(np.log2(bucket)) if bucket >= 1 else 0, OVERVIEW_BASE + len(self.levels) - 1)
+
+        if k < OVERVIEW_BASE:
+            # Fine levels from samples, at most 2^OVERVIEW_BASE samples for each pixel are read
+            samples, times = self.recording.read(start, end - start)
+            starts = np.arange(0, end - start, 2**k)
+            minimum, maximum, mean, rms = reduceBuckets(samples, starts)
+            return start + starts, minimum, maximum, mean, rms
+
+        level = self.levels[k - OVERVIEW_BASE]
+        first = start >> k
+        buckets = level[first: -(-end >> k)]
+        return (np.arange(first, first + len(buckets)) << k, buckets['min'].T.astype(float), buckets['max'].T.astype(float), 
+                buckets['mean'].T.astype(float), buckets['rms'].T.astype(float))
+
+    # Release file mapping
+    def close(self):
+        self.levels = []
+
+# Playback clock: number of samples to play for real time elapsed since previous frame
+class PlaybackClock:
+    # Custom constructor
+    def __init__(self, fs, speed=1):
+        self.fs = fs # Sampling frequency of recording in Hz
+        self.speed = speed # Playback speed multiplier
+        self.start()
+
+    # Restart counting from current moment (after pause or seek)
+    def start(self):
+        self.time = time.monotonic()
+        self.interval = 0.0 # Real time between two last frames in s
+        self.position = 0.0 # Fraction of sample left from previous frame
+
+    # Number of samples to play in this frame
+    def advance(self):
+        now = time.monotonic()
+        self.interval = now - self.time
+        self.time = now
+        self.position += self.interval*self.fs*self.speed
+        n = int(self.position)
+        self.position -= n
+        return n
+
+# Record data from devices without graphical interface
+def record(args):
+    ports = args.port.split(',')
+    channels = args.sensors*len(ports)
+    gains = (args.gain + [args.gain[-1]]*channels)[:channels]
+
+    serialMonitors = []
+    for port in ports:
+        serialMonitor = SerialMonitor()
+        serialMonitor.COM = port
+        serialMonitor.baudRate = args.baud
+        serialMonitor.serialConnect()
+        if not serialMonitor.connect:
+            print("can not open serial port " + port)
+            for monitor in serialMonitors: monitor.serialDisconnection()
+            return 1
+        serialMonitors.append(serialMonitor)
+
+    devices = DeviceManager(serialMonitors, args.sensors)
+    for i in range(channels): devices.setGain(i, gains[i])
+    devices.setSensorsNumber(args.sensors)
+    devices.start()
+
+    # Sampling frequency is measured from data of the first device
+    start = time.monotonic()
+    while min(reader.buffer.count for reader in devices.readers) < 200 and time.monotonic() - start < 3:
+        time.sleep(0.05)
+    for port, reader in zip(ports, devices.readers):
+        if reader.buffer.count < 2:
+            print("no data from device on " + port)
+            devices.stop()
+            return 1
+    reader = devices.readers[0]
+    samples, times = reader.buffer.latest(min(reader.buffer.count, reader.buffer.capacity))
+    fs = 1/np.median(np.diff(times))
+
+    fileName = args.output if args.output else datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
+    writer = RecordingWriter(fileName, channels, args.adc, fs, gains, args.codec, args.txt)
+    writer.start()
+    print("recording to \"" + os.path.abspath(writer.fileNameBIN) + "\", " + str(args.sensors) + " sensors" + 
+          (" of " + str(len(ports)) + " devices" if len(ports) > 1 else "") + ", sampling frequency = " + str(int(fs)) + " Hz")
+
+    timeOrigin = None
+    lostTotal = 0
+    start = time.monotonic()
+    reportTime = start
+    try:
+        while args.duration <= 0 or time.monotonic() - start < args.duration:
+            time.sleep(0.25)
+            samples, times, events = devices.read()
+            lostTotal += sum(lost for k, lost, kind in events if kind == LOSS_OVERRUN)
+            if len(times) > 0:
+                if timeOrigin is None: timeOrigin = times[0] - 1/fs
+                writer.submit(samples, times - timeOrigin, events)
+            if time.monotonic() - reportTime >= args.report:
+                reportTime = time.monotonic()
+                print("%8.0f s: %d samples, %d lost (%d overrun), %d bad frames, %d time gaps, writer stalls %d" % (reportTime - start, writer.samples, 
+                      lostTotal + devices.counter('lost'), lostTotal, devices.counter('dropped'), devices.counter('gaps'), writer.stalls))
+    except KeyboardInterrupt:
+        pass
+
+    devices.stop()
+    samples, times, events = devices.read()
+    lostTotal += sum(lost for k, lost, kind in events if kind == LOSS_OVERRUN)
+    if len(times) > 0 and timeOrigin is not None: writer.submit(samples, times - timeOrigin, events)
+    writer.close()
+    print("recording stopped: " + str(writer.samples) + " samples, " + str(lostTotal + devices.counter('lost')) + " lost")
+    return 0
+
+# Convert one recording, settings - dict of convert command options. Runs in worker process,
+# returns (input file, output file, input size in bytes, samples number, error message or None)
+def convertFile(fileName, outputName, settings):
+    try:
+        recording = openRecording(fileName)
+    except (OSError, ValueError, struct.error) as error:
+        return fileName, outputName, 0, 0, str(error)
+    size = os.path.getsize(fileName)
+    try:
+        # Same processing as in GUI, raw signal is not filtered but may be scaled to μV
+        pipeline = EMGPipeline(loadStages(settings['stages']) if settings['signal'] != 'raw' else ())
+        raw = settings['signal'] == 'raw'
+        pipeline.configure(recording.fs, 0 if raw else settings['notch'], None if raw else settings['bandpass'], recording.ADCbits, 
+                           [GAINS[g] for g in recording.gains], settings['alpha'], settings['microvolts'], settings['zeroPhase'])
+        signal = pipeline.envelope if settings['signal'] == 'envelope' else pipeline.signal
+        if settings['signal'] == 'features':
+            # Features of zero-centered filtered signal (envelope stage input)
+            signal = lambda: pipeline.inputs['envelope']
+            features = Features(settings['window'], settings['hop'], settings['threshold'])
+            features.configure(settings['window'], settings['hop'], recording.fs, settings['threshold'], 
+                               low=settings['bandpass'][0] if settings['bandpass'] else 0, 
+                               high=settings['bandpass'][1] if settings['bandpass'] else np.inf)
+
+        # Zero-phase filtering needs the whole recording, causal filtering goes block by block
+        blocks = range(0, recording.length, CONVERT_BLOCK)
+        if settings['zeroPhase'] and not raw:
+            samples, allTimes = recording.read(0, recording.length)
+            pipeline.process(np.asarray(samples, float))
+            processed = signal()
+            source = lambda start: (processed[:, start: start + CONVERT_BLOCK], allTimes[start: start + CONVERT_BLOCK])
+        else:
+            def source(start):
+                samples, times = recording.read(start, CONVERT_BLOCK)
+                pipeline.process(np.asarray(samples, float))
+                return signal(), times
+
+        if settings['signal'] == 'features':
+            rows = []
+            output = FeaturesWriter(outputName, recording.channels, ' ' if settings['format'] == 'txt' else ',') if settings['format'] != 'npy' else None
+            for start in blocks:
+                data, times = source(start)
+                featureTimes, values = features.process(data, times)
+                if output is None:
+                    rows.append(np.column_stack((featureTimes, np.transpose(values, (0, 2, 1)).reshape(len(featureTimes), -1))))
+                else:
+                    output.write(featureTimes, values)
+            if output is None:
+                np.save(outputName, np.concatenate(rows) if rows else np.zeros((0, 1 + len(FEATURES)*recording.channels)))
+            else:
+                output.close()
+            return fileName, outputName, size, recording.length, None
+
+        if settings['format'] == 'npy':
+            output = np.lib.format.open_memmap(outputName, 'w+', np.float64, (recording.length, recording.channels + 1))
+        else:
+            output = open(outputName, 'w')
+        textChannels = max(SENSORS_MAX, recording.channels) # Columns of text file, at least 6 sensors as written by one device
+        if settings['format'] == 'txt':
+            output.write(datetime.fromtimestamp(getattr(recording, 'startTime', os.path.getmtime(fileName))).strftime("Date: %Y.%m.%d\rTime: %H:%M:%S") + "\r\n")
+            output.write("File format: \r\ntime in s | " + str(textChannels) + " sensor data points in in mkV\r\n")
+        elif settings['format'] == 'csv':
+            output.write(','.join(['time'] + ['sensor ' + str(i + 1) for i in range(recording.channels)]) + '\n')
+
+        for start in blocks:
+            data, times = source(start)
+            if settings['format'] == 'npy':
+                output[start: start + len(times), 0] = times
+                output[start: start + len(times), 1:] = data.T
+            elif settings['format'] == 'csv':
+                output.write(formatText(data, times, ',', '\n'))
+            else:
+                # Text file holds all channels of several devices or 6 sensors of one device, as written during recording
+                padded = np.zeros((textChannels, len(times)))
+                padded[:recording.channels] = data
+                output.write(formatText(padded, times))
+        if settings['format'] == 'npy':
+            output.flush()
+            del output
+        else:
+            output.close()
+        length = recording.length
+    except (OSError, ValueError) as error:
+        return fileName, outputName, size, 0, str(error)
+    finally:
+        recording.close()
+    return fileName, outputName, size, length, None
+
+# Convert and filter recordings (*.bin) in parallel processes
+def convert(args):
+    files = []
+    for path in args.inputs:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith('.bin'))
+        else:
+            files.append(path)
+    if len(files) == 0:
+        print("no recordings (*.bin) found")
+        return 1
+    if args.window < 2 or not 0 < args.hop <= args.window:
+        print("features window must be at least 2 samples and hop from 1 to window")
+        return 1
+    if args.out and not os.path.isdir(args.out):
+        os.makedirs(args.out)
+
+    settings = {'format': args.format, 'signal': args.signal, 'bandpass': args.bandpass, 'notch': args.notch,
+                'zeroPhase': args.zero_phase, 'alpha': args.alpha, 'microvolts': args.uv, 'stages': args.stage,
+                'window': args.window, 'hop': args.hop, 'threshold': args.threshold}
+    outputs = [os.path.join(args.out or os.path.dirname(f), os.path.splitext(os.path.basename(f))[0] + '_' + args.signal + '.' + args.format) for f in files]
+
+    errors = 0
+    size = 0
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(args.jobs or None) as pool:
+        for fileName, outputName, fileSize, samples, error in pool.map(convertFile, files, outputs, [settings]*len(files)):
+            size += fileSize
+            if error is None:
+                print(fileName + " -> " + outputName + " (" + str(samples) + " samples)")
+            else:
+                errors += 1
+                print(fileName + ": " + error)
+    elapsed = time.perf_counter() - start
+    print("%d files (%d failed) in %.2f s: %.1f files/s, %.1f MB/s" % (len(files), errors, elapsed, len(files)/elapsed, size/elapsed/2**20))
+    return 1 if errors > 0 else 0
+
+# Command line tools
+def main(argv):
+    parser = argparse.ArgumentParser(prog='ELEMYO_GUI.py', description='ELEMYO command line tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_record = commands.add_parser('record', help='record data from device without graphical interface')
+    parser_record.add_argument('--port', required=True, help='serial port of device, e.g. COM3 or /dev/ttyUSB0, comma-separated ports of several devices')
+    parser_record.add_argument('--sensors', type=int, default=1, choices=range(1, 7), help='number of sensors (1-6)')
+    parser_record.add_argument('--gain', type=gainIndices, default='1', help='sensors gain ' + str(GAINS) + ', one value or comma-separated value for each sensor of all devices')
+    parser_record.add_argument('--adc', type=int, default=10, choices=(8, 10, 12, 14, 16), help='ADC resolution in bits')
+    parser_record.add_argument('--duration', type=float, default=0, help='recording duration in s, 0 - until Ctrl+C')
+    parser_record.add_argument('--output', default='', help='recording file name without extension (default - current date and time)')
+    parser_record.add_argument('--codec', default='none', choices=CODECS, help='compression of recording data')
+    parser_record.add_argument('--txt', action='store_true', help='also write text (*.txt) recording')
+    parser_record.add_argument('--baud', type=int, default=250000, help='serial baud rate')
+    parser_record.add_argument('--report', type=float, default=10, help='status report period in s')
+    parser_record.set_defaults(function=record)
+
+    parser_convert = commands.add_parser('convert', help='convert and filter recordings (*.bin) in parallel')
+    parser_convert.add_argument('inputs', nargs='+', help='recording files or directories with recordings')
+    parser_convert.add_argument('--format', default='txt', choices=CONVERT_FORMATS, help='output format, txt - same as recorded text files')
+    parser_convert.add_argument('--out', default='', help='output directory (default - next to recording)')
+    parser_convert.add_argument('--signal', default='filtered', choices=('raw', 'filtered', 'envelope', 'features'), help='signal to write, features - windowed EMG features of filtered signal')
+    parser_convert.add_argument('--bandpass', type=float, nargs=2, metavar=('LOW', 'HIGH'), help='band-pass filter frequencies in Hz')
+    parser_convert.add_argument('--notch', type=int, default=0, choices=(0, 50, 60), help='notch filter of mains frequency and its harmonics, 0 - off')
+    parser_convert.add_argument('--zero-phase', action='store_true', help='forward-backward filtering without phase delay')
+    parser_convert.add_argument('--alpha', type=float, default=0.95, help='envelope smoothing coefficient')
+    parser_convert.add_argument('--uv', action='store_true', help='data in μV instead of ADC units')
+    parser_convert.add_argument('--stage', default=os.environ.get('ELEMYO_PIPELINE', ''), help='custom pipeline stages module:Class,... added before envelope')
+    parser_convert.add_argument('--window', type=int, default=256, help='features window in samples')
+    parser_convert.add_argument('--hop', type=int, default=64, help='samples between features windows')
+    parser_convert.add_argument('--threshold', type=float, default=0, help='minimal signal step counted by ZC and SSC features')
+    parser_convert.add_argument('--jobs', type=int, default=0, help='number of worker processes, 0 - number of CPUs')
+    parser_convert.set_defaults(function=convert)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,588 @@
+# Stream of live ELEMYO samples to other programs on the same host over TCP or UDP
+# 2026-10-17 by ELEMYO (https://github.com/ELEMYO/ELEMYO-GUI)
+#
+# Changelog:
+#     2026-10-17 - UDP socket on the port given to TCP socket when any free port (0) is requested, automated loopback test
+#     2026-10-17 - filtered and envelope data by EMGPipeline, same stages as in GUI
+#     2026-10-17 - initial release, stream server, client, loopback test
+#
+# Usage:
+#     python ELEMYO_stream.py serve --port COM3[,COM4] [--sensors 1] [--bandpass 10 500] [--notch 50] [--uv]
+#     python ELEMYO_stream.py listen [--udp] [--kinds raw,filtered,envelope]
+#     python ELEMYO_stream.py test [--udp] [--serial /dev/pts/N] [--duration 10]
+#     python -m pytest tests  (automated TCP and UDP loopback test, tests/test_stream.py)
+#     Live mode of ELEMYO_GUI.py: STREAM button in toolbar.
+#
+# Message: header STREAM_HEADER (48 bytes) and samples (channels, n) in row order,
+# raw samples are uint16 ADC values, filtered and envelope samples are float32 (ADC units or μV):
+#     magic 'EMYS', version, kind (1 - raw, 2 - filtered, 3 - envelope), device number, channels,
+#     n, samples lost before block, sequence number of (device, kind) messages,
+#     device time of the first sample in s, time between samples in s, time.time() of serial read.
+# TCP subscriber may send 'SUB' + kinds mask byte (bit 0 - raw, bit 1 - filtered, bit 2 - envelope),
+# all kinds are sent by default. UDP subscriber sends the same datagram at least every
+# UDP_TIMEOUT s to the same port, 'END' stops the stream. Blocks longer than UDP_SIZE are sent in parts.
+
+# Code is placed under the MIT license
+# Copyright (c) 2020 ELEMYO
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+import sys
+import time
+import struct
+import socket
+import selectors
+import threading
+import argparse
+import collections
+import numpy as np
+from ELEMYO_core import GAINS, SENSORS_MAX, SerialMonitor, DeviceManager, EMGPipeline, loadStages, gainIndices
+
+STREAM_MAGIC = b'EMYS'
+STREAM_VERSION = 1
+STREAM_PORT = 5757 # Default TCP and UDP port
+STREAM_HEADER = struct.Struct('<4sBBBBIIQddd')
+KIND_RAW = 1
+KIND_FILTERED = 2
+KIND_ENVELOPE = 3
+STREAM_KINDS = {'raw': KIND_RAW, 'filtered': KIND_FILTERED, 'envelope': KIND_ENVELOPE}
+STREAM_DTYPES = {KIND_RAW: np.dtype('<u2'), KIND_FILTERED: np.dtype('<f4'), KIND_ENVELOPE: np.dtype('<f4')}
+UDP_SIZE = 8192 # Maximum UDP datagram size in bytes
+UDP_TIMEOUT = 5 # UDP subscription is dropped without renewal in s
+
+# Mask of kinds, kinds - iterable of names from STREAM_KINDS
+def kindsMask(kinds):
+    mask = 0
+    for kind in kinds: mask |= 1 << (STREAM_KINDS[kind] - 1)
+    return mask
+
+# Message of one block
+def encodeBlock(kind, device, sequence, samples, time0, dt, lost, received):
+    header = STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, kind, device, samples.shape[0], samples.shape[1], lost, sequence, time0, dt, received)
+    return header + np.ascontiguousarray(samples, STREAM_DTYPES[kind]).tobytes()
+
+# Publisher of raw, filtered and envelope blocks to TCP and UDP subscribers. Blocks are processed and sent
+# in the thread which publishes them (acquisition thread of device), server thread accepts subscribers
+# and sends what did not fit into TCP socket buffers.
+class StreamServer(threading.Thread):
+    # Custom constructor, queueLimit - bytes waiting for slow TCP subscriber after which it is disconnected,
+    # stages - custom stages 'module:Class,...' of pipelines
+    def __init__(self, host='127.0.0.1', port=STREAM_PORT, sensors=SENSORS_MAX, queueLimit=2**20, stages=''):
+        threading.Thread.__init__(self, daemon=True)
+        self.stages = stages
+        self.sensors = sensors # Published channels of each device
+        self.queueLimit = queueLimit
+        self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.tcp.bind((host, port))
+            self.udp.bind((host, self.tcp.getsockname()[1])) # Same port number if port 0 (any free port) is given
+        except OSError:
+            self.tcp.close()
+            self.udp.close()
+            raise
+        self.tcp.listen(8)
+        self.tcp.setblocking(False)
+        self.udp.setblocking(False)
+        self.address = self.tcp.getsockname()
+        self.lock = threading.Lock()
+        self.clients = {} # TCP subscribers: socket -> [kinds mask, bytes waiting to be sent]
+        self.subscribers = {} # UDP subscribers: address -> [kinds mask, time of last subscription]
+        self.pipelines = {} # Processing pipeline of each device
+        self.sequences = collections.defaultdict(int) # Number of next message of (device, kind)
+        self.settings = {'fs': 1000} # EMGPipeline.configure arguments, gains - of channels of all devices
+        self.messages = 0 # Sent messages
+        self.dropped = 0 # Messages not sent to UDP subscribers (socket buffer is full)
+        self.disconnected = 0 # TCP subscribers disconnected as too slow
+        self.closed = [] # Dropped TCP subscribers to be closed
+        self.running = False
+
+    # Number of TCP and UDP subscribers
+    def count(self):
+        return len(self.clients) + len(self.subscribers)
+
+    # Set pipeline settings used for filtered and envelope blocks, arguments of EMGPipeline.configure
+    def configure(self, **settings):
+        with self.lock:
+            self.settings = settings
+            for device, pipeline in self.pipelines.items(): self.configurePipeline(device, pipeline)
+
+    # Gains of device channels are taken from gains of all devices
+    def configurePipeline(self, device, pipeline):
+        settings = dict(self.settings)
+        settings['gains'] = list(settings.get('gains', ()))[device*self.sensors: (device + 1)*self.sensors]
+        pipeline.configure(**settings)
+
+    # Set number of published channels of each device
+    def setSensorsNumber(self, num):
+        with self.lock:
+            self.sensors = int(num)
+            for device, pipeline in self.pipelines.items(): self.configurePipeline(device, pipeline)
+
+    # Listener of SerialReader: publishes block received by acquisition thread
+    def listener(self, reader, samples, times, events, received):
+        self.publish(reader.device, samples, times, reader.dt, sum(event[1] for event in events), received)
+
+    # Send block (SENSORS_MAX, n) of raw ADC samples and its filtered data and envelope to subscribers,
+    # received - time.time() when samples were read from device
+    def publish(self, device, samples, times, dt, lost=0, received=None):
+        if len(times) == 0:
+            return
+        received = time.time() if received is None else received
+        with self.lock:
+            if self.count() == 0:
+                self.pipelines.clear()
+                return
+            mask = 0
+            for client in self.clients.values(): mask |= client[0]
+            for subscriber in self.subscribers.values(): mask |= subscriber[0]
+
+            blocks = [(KIND_RAW, samples[:self.sensors])]
+            if mask & 6:
+                if device not in self.pipelines:
+                    self.pipelines[device] = EMGPipeline(loadStages(self.stages))
+                    self.configurePipeline(device, self.pipelines[device])
+                pipeline = self.pipelines[device]
+                pipeline.process(samples)
+                blocks.append((KIND_FILTERED, pipeline.signal()[:self.sensors]))
+                blocks.append((KIND_ENVELOPE, pipeline.envelope()[:self.sensors]))
+
+            for kind, block in blocks:
+                bit = 1 << (kind - 1)
+                if not mask & bit: continue
+                step = max(1, (UDP_SIZE - STREAM_HEADER.size)//max(1, block.shape[0]*STREAM_DTYPES[kind].itemsize))
+                for k in range(0, block.shape[1], step):
+                    message = encodeBlock(kind, device, self.sequences[(device, kind)], block[:, k: k + step], times[k], dt, lost if k == 0 else 0, received)
+                    self.sequences[(device, kind)] += 1
+                    self.messages += 1
+                    self.send(message, bit)
+
+    # Send message to subscribers of kind bit
+    def send(self, message, bit):
+        for sock, client in list(self.clients.items()):
+            if client[0] & bit:
+                client[1] += message
+                self.flush(sock, client)
+        for address, subscriber in list(self.subscribers.items()):
+            if subscriber[0] & bit:
+                try:
+                    self.udp.sendto(message, address)
+                except BlockingIOError:
+                    self.dropped += 1
+                except OSError:
+                    del self.subscribers[address]
+
+    # Send bytes waiting for TCP subscriber, subscriber is disconnected if too much is waiting
+    def flush(self, sock, client):
+        try:
+            sent = sock.send(client[1])
+            del client[1][:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.remove(sock)
+            return
+        if len(client[1]) > self.queueLimit:
+            self.disconnected += 1
+            self.remove(sock)
+
+    # Drop TCP subscriber, socket is closed by server thread
+    def remove(self, sock):
+        if self.clients.pop(sock, None) is not None:
+            self.closed.append(sock)
+
+    # Accept subscribers and send waiting data
+    def run(self):
+        self.running = True
+        selector = selectors.DefaultSelector()
+        selector.register(self.tcp, selectors.EVENT_READ)
+        selector.register(self.udp, selectors.EVENT_READ)
+        while self.running:
+            for key, mask in selector.select(0.01 if any(len(c[1]) > 0 for c in self.clients.values()) else 0.1):
+                if key.fileobj is self.tcp:
+                    try:
+                        sock, address = self.tcp.accept()
+                    except OSError:
+                        continue
+                    sock.setblocking(False)
+                    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                    with self.lock: self.clients[sock] = [7, bytearray()]
+                    selector.register(sock, selectors.EVENT_READ)
+                elif key.fileobj is self.udp:
+                    try:
+                        data, address = self.udp.recvfrom(64)
+                    except OSError:
+                        continue
+                    with self.lock:
+                        if data[:3] == b'SUB': self.subscribers[address] = [data[3] if len(data) > 3 else 7, time.monotonic()]
+                        elif data[:3] == b'END': self.subscribers.pop(address, None)
+                else:
+                    try:
+                        data = key.fileobj.recv(64)
+                    except OSError:
+                        data = b''
+                    with self.lock:
+                        if len(data) == 0:
+                            self.remove(key.fileobj)
+                        elif data[:3] == b'SUB' and key.fileobj in self.clients:
+                            self.clients[key.fileobj][0] = data[3] if len(data) > 3 else 7
+            with self.lock:
+                for sock, client in list(self.clients.items()):
+                    if len(client[1]) > 0: self.flush(sock, client)
+                now = time.monotonic()
+                for address in [a for a, s in self.subscribers.items() if now - s[1] > UDP_TIMEOUT]:
+                    del self.subscribers[address]
+                for sock in self.closed:
+                    if sock in selector.get_map(): selector.unregister(sock)
+                    sock.close()
+                self.closed.clear()
+        selector.close()
+
+    # Stop thread, disconnect subscribers and close sockets
+    def stop(self):
+        self.running = False
+        if self.is_alive(): self.join()
+        with self.lock:
+            for sock in list(self.clients) + self.closed: sock.close()
+            self.clients.clear()
+            self.closed.clear()
+            self.subscribers.clear()
+        self.tcp.close()
+        self.udp.close()
+
+# Block received by StreamClient
+class StreamBlock:
+    # Custom constructor from message header fields and samples (channels, n)
+    def __init__(self, kind, device, sequence, time0, dt, lost, received, samples):
+        self.kind = kind
+        self.device = device
+        self.sequence = sequence
+        self.time = time0 # Device time of the first sample in s
+        self.dt = dt # Time between samples in s
+        self.lost = lost # Samples lost before block
+        self.received = received # time.time() of serial read of samples
+        self.samples = samples
+
+    # Device times of samples in s (samples lost inside block are not taken into account)
+    def times(self):
+        return self.time + self.dt*np.arange(self.samples.shape[1])
+
+# Subscriber of StreamServer
+class StreamClient:
+    # Custom constructor, kinds - names from STREAM_KINDS
+    def __init__(self, host='127.0.0.1', port=STREAM_PORT, udp=False, kinds=tuple(STREAM_KINDS)):
+        self.address = (host, port)
+        self.udp = udp
+        self.mask = kindsMask(kinds)
+        self.sock = None
+        self.data = bytearray() # Received part of TCP stream
+        self.subscribed = 0 # Time of last UDP subscription
+        self.sequences = {} # Next expected sequence number of (device, kind)
+        self.blocks = 0 # Received blocks
+        self.gaps = 0 # Messages missed by subscriber (sequence number gaps)
+        self.latency = collections.deque(maxlen=100000) # Time from serial read to receipt of blocks in s
+
+    def connect(self):
+        if self.udp:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind((self.address[0], 0))
+            self.subscribe()
+        else:
+            self.sock = socket.create_connection(self.address)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.sendall(b'SUB' + bytes([self.mask]))
+        return self
+
+    def subscribe(self):
+        self.sock.sendto(b'SUB' + bytes([self.mask]), self.address)
+        self.subscribed = time.monotonic()
+
+    def close(self):
+        if self.sock is not None:
+            if self.udp:
+                try:
+                    self.sock.sendto(b'END', self.address)
+                except OSError:
+                    pass
+            self.sock.close()
+            self.sock = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *args):
+        self.close()
+
+    # Next block or None if nothing was received during timeout in s
+    def receive(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.udp and time.monotonic() - self.subscribed > 1:
+                self.subscribe()
+            if not self.udp and len(self.data) >= STREAM_HEADER.size:
+                header = STREAM_HEADER.unpack_from(self.data)
+                size = STREAM_HEADER.size + header[4]*header[5]*STREAM_DTYPES[header[2]].itemsize
+                if len(self.data) >= size:
+                    block = self.decode(bytes(self.data[:size]))
+                    del self.data[:size]
+                    return block
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                return None
+            self.sock.settimeout(min(wait, 1))
+            try:
+                data = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            if self.udp:
+                return self.decode(data)
+            if len(data) == 0:
+                raise ConnectionError('stream server closed connection')
+            self.data += data
+
+    # Block of message, sequence gaps and latency are counted
+    def decode(self, message):
+        magic, version, kind, device, channels, n, lost, sequence, time0, dt, received = STREAM_HEADER.unpack_from(message)
+        if magic != STREAM_MAGIC or version != STREAM_VERSION:
+            raise ValueError('not an ELEMYO stream message')
+        samples = np.frombuffer(message, STREAM_DTYPES[kind], channels*n, STREAM_HEADER.size).reshape(channels, n)
+        expected = self.sequences.get((device, kind))
+        if expected is not None and sequence > expected:
+            self.gaps += sequence - expected
+        self.sequences[(device, kind)] = sequence + 1
+        self.blocks += 1
+        self.latency.append(time.time() - received)
+        return StreamBlock(kind, device, sequence, time0, dt, lost, received, samples)
+
+    # Blocks until Ctrl+C or connection is closed
+    def __iter__(self):
+        while True:
+            block = self.receive()
+            if block is not None:
+                yield block
+
+# Latency percentiles in ms
+def latencyText(latency):
+    p = np.percentile(np.asarray(latency)*1e3, (50, 95, 99, 100)) if len(latency) > 0 else np.zeros(4)
+    return "latency p50 %.2f, p95 %.2f, p99 %.2f, max %.2f ms" % tuple(p)
+
+# Open ports of devices, returns DeviceManager or None
+def openDevices(ports, sensors, gains, baud):
+    serialMonitors = []
+    for port in ports:
+        serialMonitor = SerialMonitor()
+        serialMonitor.COM = port
+        serialMonitor.baudRate = baud
+        serialMonitor.serialConnect()
+        if not serialMonitor.connect:
+            print("can not open serial port " + port)
+            for monitor in serialMonitors: monitor.serialDisconnection()
+            return None
+        serialMonitors.append(serialMonitor)
+    devices = DeviceManager(serialMonitors, sensors)
+    for i in range(sensors*len(ports)): devices.setGain(i, gains[i % len(gains)])
+    devices.setSensorsNumber(sensors)
+    return devices
+
+# Pipeline settings of serve command, fs - sampling frequency measured from device
+def configureServer(server, args, fs, gains):
+    server.configure(fs=fs, notch=args.notch, bandpass=args.bandpass, ADCbits=args.adc, gains=[GAINS[g] for g in gains], 
+                     alpha=args.alpha, microvolts=args.uv)
+
+def serve(args):
+    ports = args.port.split(',')
+    gains = args.gain
+    devices = openDevices(ports, args.sensors, gains, args.baud)
+    if devices is None:
+        return 1
+    try:
+        server = StreamServer(args.host, args.stream_port, args.sensors, stages=args.stage)
+    except OSError as error:
+        print("can not open stream port " + str(args.stream_port) + ": " + str(error))
+        return 1
+    devices.addListener(server.listener)
+    devices.start()
+    start = time.monotonic()
+    while devices.dt <= 0 and time.monotonic() - start < 3: time.sleep(0.05)
+    if devices.dt <= 0:
+        print("no data from device on " + ports[0])
+        devices.stop()
+        server.stop()
+        return 1
+    configureServer(server, args, 1/devices.dt, [gains[i % len(gains)] for i in range(args.sensors*len(ports))])
+    server.start()
+    print("streaming " + str(args.sensors) + " sensors of " + str(len(ports)) + " device(s) on tcp/udp " + args.host + ":" + str(args.stream_port) +
+          ", sampling frequency = " + str(int(1/devices.dt)) + " Hz")
+    start = time.monotonic()
+    try:
+        while args.duration <= 0 or time.monotonic() - start < args.duration:
+            time.sleep(args.report)
+            print("%8.0f s: %d subscribers, %d messages, %d samples lost, %d UDP messages dropped, %d slow subscribers disconnected" % (time.monotonic() - start,
+                  server.count(), server.messages, devices.counter('lost'), server.dropped, server.disconnected))
+    except KeyboardInterrupt:
+        pass
+    devices.stop()
+    server.stop()
+    return 0
+
+def listen(args):
+    client = StreamClient(args.host, args.stream_port, args.udp, args.kinds.split(','))
+    try:
+        client.connect()
+    except OSError as error:
+        print("can not connect to stream server: " + str(error))
+        return 1
+    samples = collections.Counter()
+    start = time.monotonic()
+    reportTime = start
+    try:
+        while args.duration <= 0 or time.monotonic() - start < args.duration:
+            block = client.receive(0.5)
+            if block is not None: samples[(block.device, block.kind)] += block.samples.shape[1]
+            if time.monotonic() - reportTime >= args.report:
+                reportTime = time.monotonic()
+                print("%8.0f s: %d blocks, %d missed, %s, samples %s" % (reportTime - start, client.blocks, client.gaps, latencyText(client.latency),
+                      dict(samples)))
+                client.latency.clear()
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+    client.close()
+    return 0
+
+# Loopback test: blocks of synthetic source (or of device on serial port) are published and received
+# on the same host, data, sequence numbers and latency from serial read to subscriber are checked
+def test(args):
+    try:
+        server = StreamServer('127.0.0.1', args.stream_port, args.sensors)
+    except OSError as error:
+        print("can not open stream port " + str(args.stream_port) + ": " + str(error))
+        return 1
+    server.start()
+    client = StreamClient('127.0.0.1', args.stream_port, args.udp)
+    # Subscription is repeated over UDP (datagram may be lost), test fails if server does not register subscriber
+    deadline = time.monotonic() + UDP_TIMEOUT
+    try:
+        client.connect()
+        while server.count() == 0 and server.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.01)
+            if args.udp and time.monotonic() - client.subscribed > 0.5: client.subscribe()
+    except OSError as error:
+        print("can not connect to stream server: " + str(error))
+    if server.count() == 0:
+        print("subscriber was not registered by stream server " + ("in " + str(UDP_TIMEOUT) + " s" if server.is_alive() else "(server thread stopped)"))
+        client.close()
+        server.stop()
+        return 1
+
+    devices = None
+    sent = collections.Counter()
+    if args.serial:
+        devices = openDevices(args.serial.split(','), args.sensors, [0], args.baud)
+        if devices is None:
+            server.stop()
+            return 1
+        devices.addListener(server.listener)
+        devices.start()
+    else:
+        # Synthetic device: blocks of 16 frames at fs, read every 5 ms like acquisition thread
+        def source():
+            n, count = 0, 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < args.duration:
+                m = int((time.perf_counter() - start)*args.fs) - count
+                if m > 0:
+                    samples = (512 + 100*np.sin(np.arange(count, count + m)*0.05) + np.arange(SENSORS_MAX)[:, None]).astype(np.uint16)
+                    server.publish(0, samples, (np.arange(count, count + m) + 1)/args.fs, 1/args.fs)
+                    sent[KIND_RAW] += m
+                    count += m
+                time.sleep(0.005)
+        threading.Thread(target=source, daemon=True).start()
+
+    received = collections.Counter()
+    errors = 0
+    start = time.monotonic()
+    while time.monotonic() - start < args.duration + 0.5:
+        block = client.receive(0.5)
+        if block is None: continue
+        received[block.kind] += block.samples.shape[1]
+        if block.kind == KIND_RAW and not args.serial:
+            index = np.round(block.times()*args.fs).astype(int) - 1
+            expected = (512 + 100*np.sin(index*0.05) + np.arange(args.sensors)[:, None]).astype(np.uint16)
+            errors += int(np.any(block.samples != expected))
+    if devices is not None:
+        devices.stop()
+    client.close()
+    server.stop()
+
+    print("%s: %d blocks, %d raw / %d filtered / %d envelope samples, %d missed messages, %d damaged blocks, %d UDP messages dropped" %
+          ("udp" if args.udp else "tcp", client.blocks, received[KIND_RAW], received[KIND_FILTERED], received[KIND_ENVELOPE], client.gaps, errors,
+           server.dropped))
+    print(latencyText(client.latency) + (" (from serial read)" if args.serial else ""))
+    ok = errors == 0 and client.blocks > 0 and (args.udp or client.gaps == 0) and (args.serial or received[KIND_RAW] == sent[KIND_RAW] or args.udp)
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+# Command line tools
+def main(argv):
+    parser = argparse.ArgumentParser(prog='ELEMYO_stream.py', description='ELEMYO stream of live samples over TCP/UDP')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_serve = commands.add_parser('serve', help='stream data of device without graphical interface')
+    parser_serve.add_argument('--port', required=True, help='serial port of device, e.g. COM3 or /dev/ttyUSB0, comma-separated ports of several devices')
+    parser_serve.add_argument('--sensors', type=int, default=1, choices=range(1, 7), help='number of sensors (1-6)')
+    parser_serve.add_argument('--gain', type=gainIndices, default='1', help='sensors gain ' + str(GAINS) + ', one value or comma-separated value for each sensor')
+    parser_serve.add_argument('--adc', type=int, default=10, choices=(8, 10, 12, 14, 16), help='ADC resolution in bits')
+    parser_serve.add_argument('--bandpass', type=float, nargs=2, metavar=('LOW', 'HIGH'), help='band-pass filter frequencies in Hz')
+    parser_serve.add_argument('--notch', type=int, default=0, choices=(0, 50, 60), help='notch filter of mains frequency and its harmonics, 0 - off')
+    parser_serve.add_argument('--alpha', type=float, default=0.95, help='envelope smoothing coefficient')
+    parser_serve.add_argument('--uv', action='store_true', help='filtered and envelope data in μV instead of ADC units')
+    parser_serve.add_argument('--stage', default=os.environ.get('ELEMYO_PIPELINE', ''), help='custom pipeline stages module:Class,... added before envelope')
+    parser_serve.add_argument('--duration', type=float, default=0, help='run time in s, 0 - until Ctrl+C')
+    parser_serve.add_argument('--baud', type=int, default=250000, help='serial baud rate')
+    parser_serve.add_argument('--report', type=float, default=10, help='status report period in s')
+    parser_serve.set_defaults(function=serve)
+
+    parser_listen = commands.add_parser('listen', help='receive stream and print statistics')
+    parser_listen.add_argument('--udp', action='store_true', help='receive over UDP instead of TCP')
+    parser_listen.add_argument('--kinds', default=','.join(STREAM_KINDS), help='comma-separated kinds: ' + ', '.join(STREAM_KINDS))
+    parser_listen.add_argument('--duration', type=float, default=0, help='run time in s, 0 - until Ctrl+C')
+    parser_listen.add_argument('--report', type=float, default=2, help='status report period in s')
+    parser_listen.set_defaults(function=listen)
+
+    parser_test = commands.add_parser('test', help='loopback test of server and client')
+    parser_test.add_argument('--udp', action='store_true', help='test UDP instead of TCP')
+    parser_test.add_argument('--serial', default='', help='serial port of device or emulator, default - synthetic source')
+    parser_test.add_argument('--sensors', type=int, default=6, choices=range(1, 7), help='number of sensors (1-6)')
+    parser_test.add_argument('--fs', type=float, default=5000, help='sampling frequency of synthetic source in Hz')
+    parser_test.add_argument('--duration', type=float, default=5, help='test duration in s')
+    parser_test.add_argument('--baud', type=int, default=250000, help='serial baud rate')
+    parser_test.set_defaults(function=test)
+
+    for command in (parser_serve, parser_listen, parser_test):
+        command.add_argument('--stream-port', type=int, default=STREAM_PORT, help='TCP and UDP port of stream')
+    for command in (parser_serve, parser_listen):
+        command.add_argument('--host', default='127.0.0.1', help='address of stream server')
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
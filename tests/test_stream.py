@@ -0,0 +1,79 @@
+# Loopback test of ELEMYO_stream: server on ephemeral port, TCP and UDP subscribers
+# Run: python -m pytest tests  (or python -m unittest discover tests)
+import os
+import sys
+import time
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ELEMYO_core import EMGPipeline
+from ELEMYO_stream import StreamServer, StreamClient, KIND_RAW, KIND_FILTERED, KIND_ENVELOPE, STREAM_DTYPES
+
+FS = 1000 # Sampling frequency of test signal in Hz
+SENSORS = 3 # Published channels
+SETTINGS = dict(fs=FS, notch=50, bandpass=(10, 400), ADCbits=10, gains=(), alpha=0.95) # Pipeline settings of server
+BLOCKS = (16, 16, 1, 700, 16, 2000, 5) # Published block lengths, long blocks are sent in several UDP messages
+
+class StreamLoopbackTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StreamServer('127.0.0.1', 0, SENSORS)
+        self.server.configure(**SETTINGS)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    # Publish test signal, returns raw samples (6, n) and times (n) of all blocks
+    def publish(self):
+        rng = np.random.default_rng(0)
+        n = sum(BLOCKS)
+        samples = (512 + 200*np.sin(np.arange(n)*0.3) + rng.integers(-50, 50, (6, n))).astype(np.uint16)
+        times = np.arange(1, n + 1)/FS
+        start = 0
+        for length in BLOCKS:
+            self.server.publish(0, samples[:, start: start + length], times[start: start + length], 1/FS)
+            start += length
+        return samples, times
+
+    # Receive blocks of all kinds until samples number of each kind is reached
+    def receive(self, client, n):
+        blocks = {KIND_RAW: [], KIND_FILTERED: [], KIND_ENVELOPE: []}
+        received = dict.fromkeys(blocks, 0)
+        deadline = time.monotonic() + 10
+        while min(received.values()) < n and time.monotonic() < deadline:
+            block = client.receive(0.5)
+            if block is None: continue
+            blocks[block.kind].append(block)
+            received[block.kind] += block.samples.shape[1]
+        return blocks
+
+    def check(self, udp):
+        with StreamClient('127.0.0.1', self.server.address[1], udp) as client:
+            deadline = time.monotonic() + 5
+            while self.server.count() == 0 and time.monotonic() < deadline: time.sleep(0.01)
+            self.assertEqual(self.server.count(), 1)
+            samples, times = self.publish()
+            blocks = self.receive(client, len(times))
+
+        reference = EMGPipeline()
+        reference.configure(**SETTINGS)
+        reference.process(samples)
+        expected = {KIND_RAW: samples[:SENSORS], KIND_FILTERED: reference.signal()[:SENSORS], KIND_ENVELOPE: reference.envelope()[:SENSORS]}
+        for kind, data in expected.items():
+            # Messages in order without gaps, data and sample times are the published ones
+            self.assertEqual([b.sequence for b in blocks[kind]], list(range(len(blocks[kind]))))
+            self.assertTrue(all(b.device == 0 and b.lost == 0 for b in blocks[kind]))
+            np.testing.assert_array_equal(np.concatenate([b.samples for b in blocks[kind]], axis=1), data.astype(STREAM_DTYPES[kind]))
+            np.testing.assert_allclose(np.concatenate([b.times() for b in blocks[kind]]), times, atol=1e-9)
+        self.assertEqual(client.gaps, 0)
+        self.assertEqual(self.server.dropped, 0)
+
+    def test_tcp(self):
+        self.check(False)
+
+    def test_udp(self):
+        self.check(True)
+
+if __name__ == '__main__':
+    unittest.main()